@@ -1,3 +1,18 @@
 from .core import Core
 from .lobby import Lobby
-from .translator import Translator
\ No newline at end of file
+from .translator import Translator
+from .client import CommandClient
+from .events import LiveEvent
+from .router import EventRouter
+from .dispatch import EventQueue
+from .logger import Logger
+from .recorder import Recorder, CaptureReader
+from .replay import Replay
+from .generator import MatchGenerator, FakeGameClient
+from .metrics import Metrics
+from .state import MatchState
+from .enrich import Enricher
+from .pool import DecodePool
+from .codec import FrameCodec
+from .store import EventStore, EventQuery
+from .archive import Archiver, Archive
@@ -0,0 +1,47 @@
+import argparse
+import asyncio
+
+from .replay import Replay
+from .generator import MatchGenerator, FakeGameClient
+
+### LiveApex Command Line ###
+# python -m LiveApex <command> #
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m LiveApex", description="LiveApex command line tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    replay = commands.add_parser("replay", help="replay a capture into the LiveApex WebSocket server")
+    replay.add_argument("path", help="capture file recorded with LiveApex.Recorder")
+    replay.add_argument("--speed", type=float, default=1.0, help="playback speed, 0 for as fast as possible (default 1)")
+    replay.add_argument("--uri", default="ws://127.0.0.1:7777", help="WebSocket server to send to (default ws://127.0.0.1:7777)")
+    replay.add_argument("--types", nargs="*", help="only replay these event types")
+
+    generate = commands.add_parser("generate", help="write a synthetic match to a capture file")
+    generate.add_argument("path", help="capture file to write")
+    generate.add_argument("--players", type=int, default=60, help="players in the match (default 60)")
+    generate.add_argument("--duration", type=float, default=1200, help="simulated match length in seconds (default 1200)")
+    generate.add_argument("--events-per-second", type=float, default=200, help="mid-match events per simulated second (default 200)")
+    generate.add_argument("--seed", type=int, help="seed for a repeatable match")
+
+    fake_client = commands.add_parser("fakeclient", help="act as the Apex client, streaming a synthetic match and answering requests")
+    fake_client.add_argument("--uri", default="ws://127.0.0.1:7777", help="WebSocket server to connect to (default ws://127.0.0.1:7777)")
+    fake_client.add_argument("--rate", type=float, default=200, help="frames sent per second, 0 for as fast as possible (default 200)")
+    fake_client.add_argument("--seed", type=int, help="seed for a repeatable match")
+
+    arguments = parser.parse_args()
+
+    if arguments.command == "replay":
+        stats = asyncio.run(Replay.replayCapture(arguments.path, arguments.speed, arguments.uri, arguments.types))
+        print(stats)
+
+    elif arguments.command == "generate":
+        generator = MatchGenerator(arguments.players, duration=arguments.duration, events_per_second=arguments.events_per_second, seed=arguments.seed)
+        print(f"Wrote {generator.writeCapture(arguments.path)} frames to {arguments.path}")
+
+    elif arguments.command == "fakeclient":
+        client = FakeGameClient(arguments.uri, MatchGenerator(seed=arguments.seed), arguments.rate)
+        asyncio.run(client.run())
+
+if __name__ == "__main__":
+    main()
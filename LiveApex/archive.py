@@ -0,0 +1,485 @@
+import json
+import mmap
+import struct
+import time
+from array import array
+
+from google.protobuf.descriptor import FieldDescriptor
+
+from . import events
+from . import events_pb2
+from .core import Core
+from .recorder import CaptureReader
+from .logger import getLogger
+
+# Columns are returned as NumPy arrays when it is installed, otherwise as memoryviews
+try:
+    import numpy
+
+except ImportError:
+    numpy = None
+
+### LiveApex Match Archive ###
+# Stores a match as one column per event field, memory-mapped and loaded only when a column is read #
+
+logger = getLogger("Core")
+
+ARCHIVE_MAGIC = b"LAPXARC1"
+HEADER_LENGTH = struct.Struct("<Q")
+ALIGNMENT = 8
+
+# Protobuf field type -> array typecode, strings are stored as ids into the archive's string table
+TYPECODES = {
+    FieldDescriptor.TYPE_DOUBLE: "d",
+    FieldDescriptor.TYPE_FLOAT: "f",
+    FieldDescriptor.TYPE_INT64: "q",
+    FieldDescriptor.TYPE_SINT64: "q",
+    FieldDescriptor.TYPE_SFIXED64: "q",
+    FieldDescriptor.TYPE_UINT64: "Q",
+    FieldDescriptor.TYPE_FIXED64: "Q",
+    FieldDescriptor.TYPE_INT32: "i",
+    FieldDescriptor.TYPE_SINT32: "i",
+    FieldDescriptor.TYPE_SFIXED32: "i",
+    FieldDescriptor.TYPE_ENUM: "i",
+    FieldDescriptor.TYPE_UINT32: "I",
+    FieldDescriptor.TYPE_FIXED32: "I",
+    FieldDescriptor.TYPE_BOOL: "B",
+    FieldDescriptor.TYPE_STRING: "I",
+}
+NUMPY_TYPES = {"B": "<u1", "i": "<i4", "I": "<u4", "q": "<i8", "Q": "<u8", "f": "<f4", "d": "<f8"}
+
+PLAYER_TYPE = events_pb2.Player.DESCRIPTOR.full_name
+
+# Player table columns, taken from the first time each player is seen
+PLAYER_FIELDS = (("nucleusHash", "string"), ("name", "string"), ("teamId", "value"), ("teamName", "string"), ("character", "string"), ("hardwareName", "string"))
+
+# Message type -> [(column, path, kind, typecode)], built on first use
+_column_plans = {}
+
+def columnPlan(descriptor):
+    """
+    # Column Plan
+
+    The columns stored for a message type. Scalars get a column each, nested messages are flattened with dotted names (i.e datacenter.name),
+    Player fields become an index into the player table and repeated fields are left out.
+    """
+
+    plan = _column_plans.get(descriptor)
+    if plan is None:
+        plan = _column_plans[descriptor] = list(_planFields(descriptor, (), 0))
+
+    return plan
+
+def _planFields(descriptor, path, depth):
+    for field in descriptor.fields:
+        repeated = field.is_repeated if hasattr(field, "is_repeated") else field.label == FieldDescriptor.LABEL_REPEATED
+        if repeated or (depth == 0 and field.name == "category"):
+            continue
+
+        field_path = path + (field.name,)
+        column = ".".join(field_path)
+        if field.type == FieldDescriptor.TYPE_MESSAGE:
+            if field.message_type.full_name == PLAYER_TYPE:
+                yield column, field_path, "player", "i"
+            elif field.message_type.full_name != "google.protobuf.Any" and depth < 2:
+                yield from _planFields(field.message_type, field_path, depth + 1)
+
+        elif field.type in TYPECODES:
+            yield column, field_path, "string" if field.type == FieldDescriptor.TYPE_STRING else "value", TYPECODES[field.type]
+
+class Archiver:
+    """
+    # Archiver
+
+    Converts a match into a columnar archive for fast post-match stats: one array per event field (i.e PlayerDamaged damageInflicted, attacker, weapon)
+    with strings interned into a single table and players into a player table. Read it back with Archive.
+
+    Works as a listener or relay sink, or from a capture with Archiver.fromCapture. Columns are kept in memory and written when closed.
+
+    ## Parameters
+
+    :path: (str) The archive file to create.
+
+    ## Example
+
+    ```python
+    with LiveApex.Archiver("match.lapa") as archiver:
+        await LiveApex.Core.startListener(callback, sinks = [archiver])
+    ```
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.closed = False
+        self.undecodable = 0
+
+        self._strings = {"": 0} # String -> id, in order of first use
+        self._players = {} # nucleusHash (or name) -> player index
+        self._player_columns = {name: array("I" if kind == "string" else "i") for name, kind in PLAYER_FIELDS}
+        self._tables = {} # Event type -> (plan, {column: array}), every table has a receivedAt column
+        self._live_api_event = events_pb2.LiveAPIEvent()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def fromCapture(capture_path, path):
+        """
+        # From Capture
+
+        Archive a capture written by Recorder.
+
+        ## Parameters
+
+        :capture_path: (str) The capture file.
+        :path: (str) The archive file to create.
+
+        ## Example
+
+        ```python
+        LiveApex.Archiver.fromCapture("match.lapx", "match.lapa")
+        ```
+        """
+
+        with CaptureReader(capture_path) as capture, Archiver(path) as archiver:
+            for received_at, frame in capture.frames():
+                archiver.write(frame, received_at)
+
+    # Feeding
+    def write(self, frame, received_at = None):
+        """
+        # Write
+
+        Add a raw frame, as Core.startListener delivers them to sinks.
+
+        ## Parameters
+
+        :frame: (bytes | str) The frame as received from the WebSocket server.
+        :received_at: (float) Optional. The arrival time as a unix timestamp. Default is now.
+        """
+
+        self.relay(frame, events.peekTypeURL(frame) if not isinstance(frame, str) else None, received_at)
+
+    def relay(self, frame, type_url, received_at = None):
+        """
+        # Relay
+
+        Add a raw frame whose type URL is already known, as Core.startRelay delivers them.
+        """
+
+        if isinstance(frame, str):
+            decoded = Core.decodeJSONEvent(frame, typed = True)
+            message = decoded.message if decoded is not None else None
+        else:
+            unpack = events.getUnpacker(type_url) if type_url is not None else None
+            message = None
+            if unpack is not None:
+                try:
+                    self._live_api_event.ParseFromString(frame)
+                    message = unpack(self._live_api_event.gameMessage.value)
+
+                except Exception as e:
+                    logger.warning(f"Archiver failed to decode a {events.typeName(type_url)}: {e}")
+
+        if message is None: # Not a LiveAPI event, i.e a command sent to the websocket
+            self.undecodable += 1
+            return
+
+        self.add(message, received_at)
+
+    def add(self, event, received_at = None):
+        """
+        # Add
+
+        Add a decoded event.
+
+        ## Parameters
+
+        :event: (LiveEvent | Message) A typed event, or the protobuf message itself.
+        :received_at: (float) Optional. The arrival time as a unix timestamp. Default is now.
+        """
+
+        if self.closed:
+            raise ValueError("[LiveApexArchive] Archiver is closed")
+
+        message = event.message if isinstance(event, events.LiveEvent) else event
+        event_type = message.DESCRIPTOR.name
+        table = self._tables.get(event_type)
+        if table is None:
+            plan = columnPlan(message.DESCRIPTOR)
+            table = self._tables[event_type] = (plan, {"receivedAt": array("d")} | {column: array(typecode) for column, _, _, typecode in plan})
+
+        plan, columns = table
+        columns["receivedAt"].append(time.time() if received_at is None else received_at)
+        for column, path, kind, _ in plan:
+            parent = message
+            for part in path[:-1]:
+                parent = getattr(parent, part)
+
+            if kind == "player":
+                value = self._playerIndex(getattr(parent, path[-1])) if parent.HasField(path[-1]) else -1
+            elif kind == "string":
+                value = self._intern(getattr(parent, path[-1]))
+            else:
+                value = getattr(parent, path[-1])
+
+            columns[column].append(value)
+
+    def _intern(self, string):
+        string_id = self._strings.get(string)
+        if string_id is None:
+            string_id = self._strings[string] = len(self._strings)
+        return string_id
+
+    def _playerIndex(self, player):
+        key = player.nucleusHash or player.name
+        if not key:
+            return -1
+
+        index = self._players.get(key)
+        if index is None:
+            index = self._players[key] = len(self._players)
+            for name, kind in PLAYER_FIELDS:
+                value = getattr(player, name)
+                self._player_columns[name].append(self._intern(value) if kind == "string" else value)
+
+        return index
+
+    # Writing
+    def close(self):
+        """
+        # Close
+
+        Write the archive.
+        """
+
+        if self.closed:
+            return
+
+        self.closed = True
+
+        blocks = []
+        data_offset = 0
+
+        def addColumns(columns, kinds):
+            nonlocal data_offset
+            entries = {}
+            for column, values in columns.items():
+                entries[column] = {"typecode": values.typecode, "kind": kinds.get(column, "value"), "offset": data_offset, "count": len(values)}
+                block = values.tobytes()
+                block += bytes(-len(block) % ALIGNMENT)
+                blocks.append(block)
+                data_offset += len(block)
+            return entries
+
+        header = {
+            "version": 1,
+            "players": {"count": len(self._players), "columns": addColumns(self._player_columns, dict(PLAYER_FIELDS))},
+            "events": {
+                event_type: {"count": len(columns["receivedAt"]), "columns": addColumns(columns, {column: kind for column, _, kind, _ in plan})}
+                for event_type, (plan, columns) in self._tables.items()
+            },
+            "strings": list(self._strings),
+        }
+
+        encoded = json.dumps(header, separators=(",", ":")).encode()
+        with open(self.path, "wb") as file:
+            file.write(ARCHIVE_MAGIC)
+            file.write(HEADER_LENGTH.pack(len(encoded)))
+            file.write(encoded)
+            file.write(bytes(-(len(ARCHIVE_MAGIC) + HEADER_LENGTH.size + len(encoded)) % ALIGNMENT))
+            for block in blocks:
+                file.write(block)
+
+        logger.info(f"Archived {sum(table['count'] for table in header['events'].values())} events to {self.path}")
+
+class Archive:
+    """
+    # Archive
+
+    Read an archive written by Archiver. The file is memory-mapped and a column is only read from disk when it is used.
+    Columns are NumPy arrays when NumPy is installed, otherwise memoryviews, and either way share memory with the file.
+
+    String columns (i.e weapon) hold ids into strings and player columns (i.e attacker) hold indexes into the player table, -1 for no player.
+
+    ## Parameters
+
+    :path: (str) The archive file.
+
+    ## Example
+
+    ```python
+    with LiveApex.Archive("match.lapa") as archive:
+        attacker = archive.column("PlayerDamaged", "attacker")
+        damage = archive.column("PlayerDamaged", "damageInflicted")
+        hit = attacker >= 0
+        per_player = numpy.bincount(attacker[hit], weights=damage[hit], minlength=archive.playerCount)
+    ```
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._map[:len(ARCHIVE_MAGIC)] != ARCHIVE_MAGIC:
+            self.close()
+            raise ValueError(f"[LiveApexArchive] {path} is not a LiveApex archive")
+
+        header_length, = HEADER_LENGTH.unpack_from(self._map, len(ARCHIVE_MAGIC))
+        header_start = len(ARCHIVE_MAGIC) + HEADER_LENGTH.size
+        header = json.loads(self._map[header_start:header_start + header_length])
+        self._data_start = header_start + header_length + (-(header_start + header_length) % ALIGNMENT)
+
+        self.strings = header['strings']
+        self._player_table = header['players']
+        self._tables = header['events']
+        self._string_ids = None
+        self._columns = {} # (table, column) -> column, once read
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def types(self):
+        return list(self._tables)
+
+    @property
+    def playerCount(self):
+        return self._player_table['count']
+
+    def count(self, event_type):
+        """
+        # Count
+
+        Returns the number of events of a type, 0 if there were none.
+        """
+
+        table = self._tables.get(event_type)
+        return table['count'] if table is not None else 0
+
+    def columns(self, event_type):
+        """
+        # Columns
+
+        Returns a dict of column -> kind ("value", "string" or "player") for an event type.
+        """
+
+        return {column: entry['kind'] for column, entry in self._tables[event_type]['columns'].items()}
+
+    def column(self, event_type, name):
+        """
+        # Column
+
+        Read one column of an event type, i.e column("PlayerDamaged", "damageInflicted").
+
+        ## Returns
+
+        A NumPy array, or a memoryview if NumPy is not installed.
+        """
+
+        return self._column(self._tables[event_type], name)
+
+    def playerColumn(self, name):
+        """
+        # Player Column
+
+        Read one column of the player table, i.e playerColumn("teamId"). Player indexes in event columns index into these.
+        """
+
+        return self._column(self._player_table, name)
+
+    def _column(self, table, name):
+        cache_key = (id(table), name)
+        values = self._columns.get(cache_key)
+        if values is None:
+            try: entry = table['columns'][name]
+            except KeyError: raise KeyError(f"[LiveApexArchive] No column {name!r}") from None
+
+            offset = self._data_start + entry['offset']
+            if numpy is not None:
+                values = numpy.frombuffer(self._map, dtype=NUMPY_TYPES[entry['typecode']], count=entry['count'], offset=offset)
+            else:
+                values = memoryview(self._map)[offset:offset + entry['count'] * array(entry['typecode']).itemsize].cast(entry['typecode'])
+
+            self._columns[cache_key] = values
+
+        return values
+
+    def string(self, string_id):
+        return self.strings[string_id]
+
+    def stringId(self, string):
+        """
+        # String ID
+
+        Returns the id of a string in this archive, i.e to compare a weapon column against, or None if the archive never uses it.
+        """
+
+        if self._string_ids is None:
+            self._string_ids = {string: string_id for string_id, string in enumerate(self.strings)}
+
+        return self._string_ids.get(string)
+
+    def player(self, index):
+        """
+        # Player
+
+        Returns a player from the player table as a dict.
+        """
+
+        return {name: self.strings[self.playerColumn(name)[index]] if kind == "string" else int(self.playerColumn(name)[index]) for name, kind in PLAYER_FIELDS}
+
+    def remap(self, event_type, name, ids):
+        """
+        # Remap
+
+        Read a string or player column with ids shared across archives, so several matches can be aggregated together.
+
+        ## Parameters
+
+        :event_type: (str) The event type, i.e "PlayerDamaged".
+        :name: (str) A string or player column, i.e "weapon" or "attacker".
+        :ids: (dict) Shared ids, string (or nucleusHash for players, their name if it is empty) -> id. New strings are added to it. Players missing from an event stay -1.
+
+        ## Example
+
+        ```python
+        weapon_ids = {}
+        weapons = [archive.remap("PlayerDamaged", "weapon", weapon_ids) for archive in archives]
+        ```
+        """
+
+        kind = self.columns(event_type)[name]
+        if kind == "string":
+            keys = self.strings
+        elif kind == "player":
+            keys = [self.strings[hash_id] or self.strings[name_id] for hash_id, name_id in zip(self.playerColumn("nucleusHash"), self.playerColumn("name"))]
+        else:
+            raise ValueError(f"[LiveApexArchive] {event_type}.{name} is not a string or player column")
+
+        lookup = [ids.setdefault(key, len(ids)) for key in keys]
+        lookup.append(-1) # Player index -1 stays -1
+
+        values = self.column(event_type, name)
+        if numpy is not None:
+            return numpy.asarray(lookup, dtype=numpy.int64)[values]
+
+        return array("q", [lookup[value] for value in values])
+
+    def close(self):
+        """
+        # Close
+
+        Unmap and close the archive. Columns read from it must not be used afterwards.
+        """
+
+        self._columns.clear()
+        try: self._map.close()
+        except BufferError: pass # Columns are still referenced, the map is released with them
+        self._file.close()
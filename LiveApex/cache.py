@@ -0,0 +1,175 @@
+import time
+from . import events
+from . import events_pb2
+from .logger import getLogger
+
+### LiveApex Lobby Cache ###
+# Keeps the last known lobby roster, settings and legend bans so reads skip the round-trip #
+
+logger = getLogger("Lobby")
+
+PLAYERS_TYPE = "rtech.liveapi.CustomMatch_LobbyPlayers"
+SETTINGS_TYPE = "rtech.liveapi.CustomMatch_SetSettings"
+LEGEND_BANS_TYPE = "rtech.liveapi.CustomMatch_LegendBanStatus"
+
+# Events after which the roster can no longer be trusted
+PLAYER_INVALIDATING_TYPE_URLS = frozenset(f"{events.TYPE_URL_PREFIX}rtech.liveapi.{name}" for name in ("PlayerConnected", "PlayerDisconnected", "MatchSetup"))
+
+class CacheEntry:
+    __slots__ = ("value", "updated", "valid")
+
+    def __init__(self):
+        self.value = None
+        self.updated = 0.0
+        self.valid = False
+
+    def set(self, value):
+        self.value = value
+        self.updated = time.monotonic()
+        self.valid = True
+
+    def fresh(self, max_age):
+        return self.valid and time.monotonic() - self.updated <= max_age
+
+class LobbyCache:
+    """
+    # Lobby Cache
+
+    The last known lobby players, custom match settings and legend bans, used by Lobby.getPlayers, getSettings and getLegendBans.
+    It is filled from every reply and lobby event seen on the command connection, including replies to requests made elsewhere.
+    It is patched when our own movePlayer, kickPlayer and setSettings commands are sent, and invalidated by players joining or leaving,
+    a new match, or the command connection dropping. Anything older than max_age is fetched again.
+
+    ## Parameters
+
+    :max_age: (float) Seconds a cached value is trusted without being refreshed. Default is 30.
+
+    ## Example
+
+    ```python
+    LiveApex.Core.lobby_cache.max_age = 10
+    players = await LiveApex.Lobby.getPlayers() # Instant while the cache is fresh
+    ```
+    """
+
+    def __init__(self, max_age = 30):
+        self.max_age = max_age
+        self.players = CacheEntry() # nucleusHash -> player dict
+        self.settings = CacheEntry()
+        self.legend_bans = CacheEntry()
+        self._live_api_event = events_pb2.LiveAPIEvent()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """
+        # Stats
+
+        Returns the state of each entry and the counters as a dict.
+        """
+
+        now = time.monotonic()
+        return {
+            name: {"valid": entry.valid, "age": now - entry.updated if entry.valid else None}
+            for name, entry in (("players", self.players), ("settings", self.settings), ("legendBans", self.legend_bans))
+        } | {"hits": self.hits, "misses": self.misses}
+
+    def get(self, entry):
+        """
+        # Get
+
+        Returns the value of an entry if it is fresh, otherwise None.
+        """
+
+        if entry.fresh(self.max_age):
+            self.hits += 1
+            return entry.value
+
+        self.misses += 1
+        return None
+
+    def invalidate(self):
+        """
+        # Invalidate
+
+        Forget everything, the next read of each value goes to the game.
+        """
+
+        self.players.valid = False
+        self.settings.valid = False
+        self.legend_bans.valid = False
+
+    # Filling
+    def store(self, result_type, result):
+        """
+        # Store
+
+        Fill the cache from a reply, as returned to a waiting request.
+
+        ## Parameters
+
+        :result_type: (str) The full type name of the reply, i.e rtech.liveapi.CustomMatch_LobbyPlayers.
+        :result: (dict) The reply as a dict.
+        """
+
+        # Stored as copies, the reply is also handed to the caller
+        if result_type == PLAYERS_TYPE:
+            self.players.set({player.get('nucleusHash', ""): dict(player) for player in result.get('players', [])})
+        elif result_type == SETTINGS_TYPE:
+            self.settings.set(dict(result))
+        elif result_type == LEGEND_BANS_TYPE:
+            self.legend_bans.set([dict(legend) for legend in result.get('legends', [])])
+
+    def observe(self, frame):
+        """
+        # Observe
+
+        Watch one frame from the command connection. Only lobby replies are decoded, everything else is skipped by its type URL.
+        None means the connection closed, so events may have been missed.
+        """
+
+        if frame is None:
+            self.invalidate()
+            return
+
+        type_url = events.peekTypeURL(frame)
+        if type_url is None:
+            return
+
+        if type_url in PLAYER_INVALIDATING_TYPE_URLS:
+            self.players.valid = False
+            return
+
+        if type_url != events.RESPONSE_TYPE_URL and type_url != f"{events.TYPE_URL_PREFIX}{PLAYERS_TYPE}":
+            return
+
+        try:
+            self._live_api_event.ParseFromString(frame)
+            event = events.LiveEvent(events.getUnpacker(type_url)(self._live_api_event.gameMessage.value))
+
+        except Exception as e:
+            logger.warning(f"Lobby cache failed to decode a {events.typeName(type_url)}: {e}")
+            return
+
+        if event.type == "Response":
+            if event.message.success:
+                self.store(event.replyType(), event.reply())
+        else: # Lobby roster pushed by the game
+            self.store(PLAYERS_TYPE, event.toDict())
+
+    # Patching from our own commands
+    def movePlayer(self, nucleus_hash, team_id):
+        if self.players.valid and nucleus_hash in self.players.value:
+            self.players.value[nucleus_hash] = {**self.players.value[nucleus_hash], 'teamId': team_id}
+
+    def removePlayer(self, nucleus_hash):
+        if self.players.valid:
+            self.players.value.pop(nucleus_hash, None)
+
+    def setSettings(self, settings):
+        self.settings.set(events.normalizeSettings(settings))
+
+    def invalidateLegendBans(self):
+        self.legend_bans.valid = False
@@ -0,0 +1,279 @@
+import asyncio
+import websockets
+from collections import deque
+
+### LiveApex Command Client ###
+# Keeps a single WebSocket connection open for sending commands to the game client #
+
+class PendingRequests:
+    """
+    # Pending Requests
+
+    A table of futures waiting on a reply from the game client, keyed by the full type name of the expected result.
+    The Apex LiveAPI does not echo any request id back, so requests awaiting the same type are answered oldest first.
+    """
+
+    def __init__(self):
+        self._waiting = {}
+
+    def __bool__(self):
+        return bool(self._waiting)
+
+    def add(self, response_type):
+        """
+        # Add
+
+        Register a request awaiting a result of the given type.
+
+        ## Parameters
+
+        :response_type: (str) The full type name of the expected result, i.e rtech.liveapi.CustomMatch_LobbyPlayers.
+
+        ## Returns
+
+        An asyncio.Future that resolves with the decoded result.
+        """
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(response_type, deque()).append(future)
+        return future
+
+    def discard(self, response_type, future):
+        """
+        # Discard
+
+        Remove a request from the table, i.e after it timed out.
+        """
+
+        waiting = self._waiting.get(response_type)
+        if waiting is None:
+            return
+
+        try: waiting.remove(future)
+        except ValueError: pass
+
+        if not waiting:
+            del self._waiting[response_type]
+
+    def isWaiting(self, response_type):
+        """
+        # Is Waiting
+
+        Returns True if any request is waiting on a result of the given type.
+        """
+
+        return response_type in self._waiting
+
+    def resolve(self, response_type, result):
+        """
+        # Resolve
+
+        Hand a decoded result to the oldest request waiting on its type.
+
+        ## Returns
+
+        True if a waiting request was resolved.
+        """
+
+        future = self._oldest(response_type)
+        if future is None:
+            return False
+
+        future.set_result(result)
+        return True
+
+    def reject(self, response_type, error):
+        """
+        # Reject
+
+        Fail the oldest request waiting on a type with an exception, i.e when the game client reports the request failed.
+
+        ## Returns
+
+        True if a waiting request was failed.
+        """
+
+        future = self._oldest(response_type)
+        if future is None:
+            return False
+
+        future.set_exception(error)
+        return True
+
+    def _oldest(self, response_type):
+        # Removes and returns the oldest request still waiting on a type, or None
+        waiting = self._waiting.get(response_type)
+        if waiting is None:
+            return None
+
+        while waiting:
+            future = waiting.popleft()
+            if not future.done():
+                break
+        else:
+            future = None
+
+        if not waiting:
+            del self._waiting[response_type]
+
+        return future
+
+class CommandClient:
+    """
+    # Command Client
+
+    A long-lived connection to the LiveAPI WebSocket server used to send commands.
+    The connection is opened on the first send, reused for every command after that and reopened if it drops.
+    Any number of tasks can send over the same client at the same time.
+
+    ## Parameters
+
+    :uri: (str) The WebSocket server to connect to. Default is "ws://127.0.0.1:7777".
+    :retries: (int) How many times a send is attempted before giving up. Default is 3.
+    :decoder: (function) Called as decoder(frame, pending) for frames received while requests are pending. Used to resolve replies.
+    :watcher: (function) Optional. Called as watcher(frame) for every frame received, and watcher(None) when the connection closes.
+
+    ## Example
+
+    ```python
+    client = LiveApex.CommandClient()
+    await asyncio.gather(*(client.send(message) for message in messages))
+    await client.close()
+    ```
+    """
+
+    def __init__(self, uri = "ws://127.0.0.1:7777", retries = 3, decoder = None, watcher = None):
+        self.uri = uri
+        self.retries = retries
+        self.decoder = decoder
+        self.watcher = watcher
+        self.pending = PendingRequests()
+        self.websocket = None
+        self._connect_lock = asyncio.Lock()
+        self._drain_task = None
+
+    def isConnected(self):
+        """
+        # Is Connected
+
+        Returns True if the client currently holds an open connection.
+        """
+
+        return self.websocket is not None and self.websocket.open
+
+    async def connect(self):
+        """
+        # Connect
+
+        Open the connection if it is not already open. Concurrent callers share a single connection attempt.
+
+        ## Returns
+
+        The open websocket.
+        """
+
+        if self.isConnected():
+            return self.websocket
+
+        async with self._connect_lock:
+            if self.isConnected(): # Another task connected while we waited
+                return self.websocket
+
+            self.websocket = await websockets.connect(uri=self.uri, ping_interval=20, ping_timeout=20)
+            self._drain_task = asyncio.create_task(self._drain(self.websocket))
+            return self.websocket
+
+    async def _drain(self, websocket):
+        # The server broadcasts every frame to every connection, this one included
+        # Frames must be read off the socket so the server never blocks sending to us
+        # Frames are only decoded while a request is waiting on a reply
+        try:
+            async for frame in websocket:
+                if self.watcher is not None:
+                    self.watcher(frame)
+                if self.pending and self.decoder is not None:
+                    self.decoder(frame, self.pending)
+
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+        finally:
+            if self.watcher is not None:
+                self.watcher(None)
+
+    async def send(self, message):
+        """
+        # Send
+
+        Send a message over the shared connection, reconnecting if the connection has dropped.
+
+        ## Parameters
+
+        :message: (str | bytes) The message to send.
+
+        ## Raises
+
+        websockets.exceptions.ConnectionClosed | If every attempt failed.
+        OSError | If the WebSocket server could not be reached.
+        """
+
+        for attempt in range(self.retries):
+            websocket = await self.connect()
+            try:
+                await websocket.send(message)
+                return
+
+            except websockets.exceptions.ConnectionClosed:
+                await self._discard(websocket)
+                if attempt == self.retries - 1:
+                    raise
+
+    async def request(self, message, response_type, timeout = 10):
+        """
+        # Request
+
+        Send a message and wait for the game client to reply with a result of the given type.
+
+        ## Parameters
+
+        :message: (str | bytes) The message to send.
+        :response_type: (str) The full type name of the expected result.
+        :timeout: (float) Seconds to wait for the reply. Default is 10.
+
+        ## Returns
+
+        The decoded result.
+
+        ## Raises
+
+        TimeoutError | If no reply arrived within timeout.
+        """
+
+        # Register before sending so a fast reply is never missed
+        future = self.pending.add(response_type)
+        try:
+            await self.send(message)
+            return await asyncio.wait_for(future, timeout)
+
+        finally:
+            self.pending.discard(response_type, future)
+
+    async def _discard(self, websocket):
+        # Only reset if no other task has already replaced the connection
+        if self.websocket is websocket:
+            self.websocket = None
+            if self._drain_task is not None:
+                self._drain_task.cancel()
+                self._drain_task = None
+
+        await websocket.close()
+
+    async def close(self):
+        """
+        # Close
+
+        Close the connection. The next send will open a new one.
+        """
+
+        if self.websocket is not None:
+            await self._discard(self.websocket)
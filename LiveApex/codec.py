@@ -0,0 +1,135 @@
+from . import events
+from . import metrics
+from .logger import getLogger
+
+### LiveApex Frame Codec ###
+# Works out whether a connection carries Protobuf or JSON frames and counts frames that are neither #
+
+logger = getLogger("Core")
+
+METHODS = ("Auto", "Protobuf", "JSON")
+
+# The category field of every event, i.e "playerKilled"
+EVENT_CATEGORIES = frozenset(full_name.rsplit(".", 1)[-1][:1].lower() + full_name.rsplit(".", 1)[-1][1:] for full_name in events.message_classes)
+
+# Warn once if this many frames in a row could not be decoded before any could
+MISMATCH_WARNING = 50
+
+class FrameCodec:
+    """
+    # Frame Codec
+
+    Tracks the encoding of one listener's connection. With "Auto" the encoding is taken from the first frame that is a LiveAPI event,
+    a JSON object with a known @type or category means JSON and a binary LiveAPIEvent means Protobuf, and then kept for the rest of the connection.
+    Frames that can't be decoded with the chosen encoding (i.e commands other clients send through the server) are counted and skipped without parsing them.
+
+    Pass one to Core.startListener to read its counters.
+
+    ## Parameters
+
+    :method: (str) "Auto", "Protobuf" or "JSON". Default is "Auto".
+
+    ## Example
+
+    ```python
+    codec = LiveApex.FrameCodec()
+    asyncio.create_task(LiveApex.Core.startListener(callback, codec = codec))
+    print(codec.stats())
+    ```
+    """
+
+    def __init__(self, method = "Auto"):
+        if method not in METHODS:
+            raise ValueError(f"[LiveApexCodec] method expects one of {', '.join(METHODS)}")
+
+        self.method = method
+        self.detected = None if method == "Auto" else method
+
+        # Counters
+        self.frames = 0
+        self.decoded = 0
+        self.undecodable = 0
+        self._warned = False
+
+    def stats(self):
+        """
+        # Stats
+
+        Returns the encoding in use and the frame counters as a dict.
+        """
+
+        return {
+            "method": self.method,
+            "detected": self.detected,
+            "frames": self.frames,
+            "decoded": self.decoded,
+            "undecodable": self.undecodable,
+        }
+
+    def detect(self, frame):
+        """
+        # Detect
+
+        Work out the encoding from a frame. Returns "Protobuf", "JSON", or None if the frame is not a LiveAPI event.
+        A JSON frame only counts if it is an event, an object with a known @type or category.
+        """
+
+        if isinstance(frame, str) or frame.lstrip()[:1] == b"{":
+            # Commands other clients send through the server are JSON too, only an event decides it
+            try: parsed = events.loadJSON(frame)
+            except ValueError: return None
+
+            if isinstance(parsed, dict) and '@type' not in parsed and isinstance(parsed.get('gameMessage'), dict): # A whole LiveAPIEvent
+                parsed = parsed['gameMessage']
+
+            if isinstance(parsed, dict) and (parsed.get('@type') in events.message_types or parsed.get('category') in EVENT_CATEGORIES):
+                return "JSON"
+
+            return None
+
+        if events.peekTypeURL(frame) is not None:
+            return "Protobuf"
+
+        return None
+
+    def lock(self, frame):
+        """
+        # Lock
+
+        The encoding to decode a frame with. While auto-detecting, the first LiveAPI event decides it for the rest of the connection.
+        Returns None for frames that are skipped, they are counted as undecodable.
+        """
+
+        self.frames += 1
+        if self.detected is not None:
+            return self.detected
+
+        detected = self.detect(frame)
+        if detected is None:
+            self.reject()
+            return None
+
+        self.detected = detected
+        logger.info(f"Detected {detected} frames")
+        return detected
+
+    def accept(self):
+        self.decoded += 1
+
+    def reject(self):
+        """
+        # Reject
+
+        Count a frame that could not be decoded.
+        """
+
+        self.undecodable += 1
+        if metrics.enabled:
+            metrics.count("undecodable", self.detected or "")
+
+        if not self._warned and self.decoded == 0 and self.undecodable >= MISMATCH_WARNING:
+            self._warned = True
+            if self.method == "Auto":
+                logger.warning(f"No LiveAPI events in the first {self.undecodable} frames")
+            else:
+                logger.warning(f"None of the first {self.undecodable} frames could be decoded as {self.method}, check the game's launch options match the listener's method")
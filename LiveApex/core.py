@@ -1,13 +1,24 @@
 import asyncio
 import websockets
-import traceback
-import json
+import time
 import importlib
 
 from google.protobuf.any_pb2 import Any
-from google.protobuf import symbol_database
-from google.protobuf.json_format import MessageToDict
+from google.protobuf.json_format import ParseDict, ParseError
+from google.protobuf.message import DecodeError
 from . import events_pb2
+from . import events
+from . import metrics
+from .client import CommandClient
+from .scheduler import CommandScheduler
+from .cache import LobbyCache
+from .codec import FrameCodec
+from .router import EventRouter
+from .logger import getLogger, frame_trace
+
+logger = getLogger("Core")
+lobby_logger = getLogger("Lobby")
+trace_logger = getLogger("Trace")
 
 ### LiveApex Core Functions ###
 # These functions are essential for the LiveApex library to work #
@@ -19,33 +30,44 @@ class Core:
     This class contains functions to start the WebSocket server and listener.
     """
 
-    async def startLiveAPI(debug = False):
+    async def startLiveAPI(debug = False, max_queue = 1024, slow_client_policy = "drop-oldest", host = "127.0.0.1", port = 7777):
         """
         # Start the LiveAPI WebSocket server
 
         Start a WebSocket server. It is used to connect to the Apex LiveAPI to send/receive events.
 
+        ## Parameters
+
+        :debug: (bool) Print full error logs. Default is False.
+        :max_queue: (int) The most messages queued for any one connected client. Default is 1024.
+        :slow_client_policy: (str) What to do with a client whose queue is full. "drop-oldest" sheds its oldest queued message, "disconnect" closes it. Default is "drop-oldest".
+        :host: (str) The address to listen on. Default is "127.0.0.1".
+        :port: (int) The port to listen on. Default is 7777.
+
         ## Example
 
         ```python
         LiveApex.Core.startLiveAPI()
         ```
+
+        ## Notes
+
+        One server can take several game clients. Each game client and the listeners for it connect to the same path, i.e +cl_liveapi_ws_servers "ws://127.0.0.1:7777/lobby1" and Core.startListener(callback, source = "lobby1").
+        Messages are only forwarded between connections of the same source. Connections with no path share the "default" source.
         """
 
         # Import LiveApex.server
         try: websocket_server = importlib.import_module("LiveApex.server")
 
         except Exception as e:
-            if debug: print(f"[LiveApexCore] Failed to import server module: {e}\n===\nError Log\n{traceback.format_exc()}\n===")
-            else: print(f"[LiveApexCore] Failed to import server module: {e}")
+            logger.error(f"Failed to import server module: {e}", exc_info=debug)
             return
 
         # Start websocket as a background task
-        try: server_task = asyncio.create_task(websocket_server.main())
+        try: server_task = asyncio.create_task(websocket_server.main(max_queue, slow_client_policy, host, port))
 
         except Exception as e:
-            if debug: print(f"[LiveApexCore] Failed to start server: {e}\n===\nError Log\n{traceback.format_exc()}\n===")
-            else: print(f"[LiveApexCore] Failed to start server: {e}")
+            logger.error(f"Failed to start server: {e}", exc_info=debug)
             return
 
         # Await for any exceptions
@@ -53,13 +75,12 @@ class Core:
             await server_task
 
         except Exception as e:
-            if debug: print(f"[LiveApexCore] Error: {e}\n===\nError Log\n{traceback.format_exc()}\n===")
-            else: print(f"[LiveApexCore] Error: {e}")
+            logger.error(f"Error: {e}", exc_info=debug)
             return
 
-        print("[LiveApexCore] WebSocket Server Task Ended")
+        logger.info("WebSocket Server Task Ended")
 
-    async def startListener(callback, method = "Protobuf"):
+    async def startListener(callback, method = "Auto", typed = False, queue = None, sinks = None, state = None, enricher = None, host = "127.0.0.1", port = 7777, source = None, decode_pool = None, codec = None, drain_timeout = 5):
         """
         # Start the LiveAPI WebSocket server
 
@@ -67,82 +88,371 @@ class Core:
 
         ## Parameters
 
-        :callback: (function) A function that takes a single dict parameter. All decoded WebSocket messages will be fowarded to this callback for handling. This is where you will handle all events from the game.
-        :method: (string) The method to decode WebSocket messages. Can be either "Protobuf" or "JSON". Default is "Protobuf". Ensure your launch options are set correctly for your choice.
+        :callback: (function | EventRouter) A function that takes a single dict parameter. All decoded WebSocket messages will be fowarded to this callback for handling. This is where you will handle all events from the game. Pass an EventRouter to only decode and forward the event types it subscribes to.
+        :method: (string) The method to decode WebSocket messages. Can be "Auto", "Protobuf" or "JSON". Default is "Auto", which picks the one the game is sending from the first event.
+        :typed: (bool) Forward LiveEvent objects instead of dicts. Fields are read straight from the parsed message and the dict is only built if event.toDict() is called. Default is False.
+        :queue: (EventQueue) Optional. Run the callback from a bounded queue so a slow callback never stalls reading from the WebSocket. See EventQueue for the overflow policies.
+        :sinks: (list) Optional. Objects with a write(frame, received_at) method, i.e Recorder, that receive every raw frame before it is decoded.
+        :state: (MatchState) Optional. Updated from every event just before it reaches the callback, so handlers can query it.
+        :enricher: (Enricher) Optional. Adds translated display names (i.e weaponName) to events as they are decoded.
+        :host: (str) The WebSocket server's address. Default is "127.0.0.1".
+        :port: (int) The WebSocket server's port. Default is 7777.
+        :source: (str) Optional. Only receive events from the game client connected to this path on the server, i.e "lobby1". Default is the game client with no path.
+        :decode_pool: (DecodePool) Optional. Decode frames in batches on a pool of worker processes instead of on the event loop. Events still reach the callback in the order they arrived. Protobuf dicts only, typed must be False.
+        :codec: (FrameCodec) Optional. Tracks the connection's encoding and counts frames that could not be decoded. Overrides method.
+        :drain_timeout: (float) Seconds the listener waits, once the connection closes, for frames still in the decode pool and events still in the queue to reach the callback. Events left after that are dropped, logged and counted in queue.dropped. Cancelling the listener drops them straight away. Default is 5.
 
         ## Example
 
         ```python
-        LiveApex.Core.startListener(callback, "Protobuf")
+        LiveApex.Core.startListener(callback)
         ```
         """
 
-        async with websockets.connect(f"ws://127.0.0.1:7777") as websocket:
-            print("[LiveApexCore] Started WebSocket Listener\n[LiveApexCore] Awaiting connection to Apex client. This may take some time")
-            async for raw_message in websocket: # Decode, check for init, foward to callback
-                print(raw_message)
-                if method == "JSON":
-                    decoded_message = json.loads(raw_message)
-                else: # Default to protobuf
-                    decoded_message = Core.decodeSocketEvent(raw_message)
+        router = callback if isinstance(callback, EventRouter) else None
+        state_type_urls = {f"{events.TYPE_URL_PREFIX}rtech.liveapi.{event_type}" for event_type in state.types} if state is not None else ()
 
-                if decoded_message is not None:
-                    if 'category' in decoded_message and decoded_message['category'] == 'init':
-                        print("[LiveApexCore] Connection to Apex client established, LiveApex is ready")
+        async def deliver(event_type, decoded_message):
+            if state is not None:
+                state.update(decoded_message)
 
+            if router is not None:
+                if decoded_message is not None:
+                    await router.dispatch(event_type, decoded_message)
+            else:
                 await callback(decoded_message)
 
-    def decodeSocketEvent(event: Any):
+        async def process(event_type, decoded_message, stamps):
+            # Everything after decoding, shared by inline decoding and the decode pool
+            if enricher is not None and decoded_message is not None:
+                enricher.enrich(decoded_message)
+
+            if stamps is not None:
+                stamps = (stamps[0], time.perf_counter())
+                metrics.count("frames", event_type)
+                metrics.observe("decode", event_type, stamps[1] - stamps[0])
+
+            if decoded_message is not None:
+                if isinstance(decoded_message, events.LiveEvent):
+                    is_init = decoded_message.type == "Init"
+                else:
+                    is_init = 'category' in decoded_message and decoded_message['category'] == 'init'
+
+                if is_init:
+                    logger.info("Connection to Apex client established, LiveApex is ready")
+
+            if queue is not None:
+                await queue.put(event_type, decoded_message, stamps)
+            elif stamps is not None:
+                await Core._deliverMeasured(deliver, event_type, decoded_message, stamps)
+            else:
+                await deliver(event_type, decoded_message)
+
+        if codec is None:
+            codec = FrameCodec(method)
+
+        if decode_pool is not None and (typed or codec.method == "JSON"):
+            raise ValueError("[LiveApexCore] decode_pool expects Protobuf frames with typed = False")
+
+        consumer_task = asyncio.create_task(Core._consumeQueue(queue, deliver)) if queue is not None else None
+
+        async def processPooled(event_type, decoded_message, stamps):
+            # Frames that turned out not to be events are dropped like inline ones
+            if decoded_message is None:
+                codec.reject()
+                return
+
+            codec.accept()
+            await process(event_type, decoded_message, stamps)
+
+        decode_stream = decode_pool.stream(processPooled) if decode_pool is not None else None
+
         try:
-            # Parse event
-            live_api_event = events_pb2.LiveAPIEvent()
+            async with websockets.connect(f"ws://{host}:{port}/{source or ''}") as websocket:
+                logger.info("Started WebSocket Listener")
+                logger.info("Awaiting connection to Apex client. This may take some time")
+                async for raw_message in websocket: # Decode, check for init, foward to callback
+                    measure = metrics.enabled
+                    if measure:
+                        stamps = (time.perf_counter(), 0.0)
+
+                    if frame_trace.every and frame_trace.sample():
+                        trace_logger.debug(repr(raw_message))
+
+                    if sinks:
+                        received_at = time.time()
+                        for sink in sinks:
+                            sink.write(raw_message, received_at)
+
+                    frame_method = codec.lock(raw_message)
+                    if frame_method is None: # Not a LiveAPI event, counted by the codec
+                        continue
+
+                    if frame_method == "JSON":
+                        try: parsed = events.loadJSON(raw_message)
+                        except ValueError: parsed = None
+                        if isinstance(parsed, dict) and '@type' not in parsed and 'gameMessage' in parsed: # A whole LiveAPIEvent
+                            parsed = parsed['gameMessage']
+
+                        if not isinstance(parsed, dict) or not parsed.get('@type'):
+                            codec.reject()
+                            continue
+
+                        type_url = parsed['@type']
+                        event_type = events.typeName(type_url)
+
+                        # Skip types nobody subscribed to before converting
+                        if router is not None and not (router.wants(type_url) or type_url == events.INIT_TYPE_URL or type_url in state_type_urls):
+                            if measure:
+                                metrics.count("skipped", event_type)
+                            continue
+
+                        decoded_message = Core.decodeJSONEvent(parsed, typed = typed)
+                    else: # Protobuf
+                        # Text frames and frames without a LiveAPIEvent envelope would only fail to parse
+                        type_url = events.peekTypeURL(raw_message) if not isinstance(raw_message, str) else None
+                        if type_url is None:
+                            codec.reject()
+                            continue
+
+                        event_type = events.typeName(type_url)
+
+                        # Skip types nobody subscribed to before decoding
+                        if router is not None and not (router.wants(type_url) or type_url == events.INIT_TYPE_URL or type_url in state_type_urls):
+                            if measure:
+                                metrics.count("skipped", event_type)
+                            continue
+
+                        if decode_stream is not None: # Decoded in a worker process, processPooled runs once its batch returns
+                            await decode_stream.put(raw_message, event_type, stamps if measure else None)
+                            continue
+
+                        decoded_message = Core.decodeSocketEvent(raw_message, typed = typed)
+
+                    if decoded_message is None:
+                        codec.reject()
+                        continue
+
+                    codec.accept()
+                    await process(event_type, decoded_message, stamps if measure else None)
+
+            # The connection closed normally, let the last events of the match through before stopping
+            deadline = time.monotonic() + drain_timeout
+            if decode_stream is not None:
+                await decode_stream.drain(drain_timeout)
+            if consumer_task is not None:
+                await Core._drainQueue(queue, max(0.0, deadline - time.monotonic()))
+
+        finally:
+            # Anything left (i.e the listener was cancelled) is dropped straight away
+            if decode_stream is not None:
+                decode_stream.close()
+            if consumer_task is not None:
+                consumer_task.cancel()
+                queue.discard()
+
+    async def startRelay(sinks, types = None, host = "127.0.0.1", port = 7777, source = None):
+        """
+        # Start a Relay
+
+        Pass raw frames straight through to sinks without decoding them, for hosts that forward or store the stream for something else to decode.
+        Each frame is handed over as received, with only its type URL (read from the envelope, not parsed) and arrival time.
+
+        ## Parameters
+
+        :sinks: (list) Objects with a relay(frame, type_url, received_at) method, i.e Recorder. frame is the bytes received, not a copy, type_url is None for frames that aren't a Protobuf LiveAPIEvent.
+        :types: (list) Optional. Only relay these event types, i.e ["PlayerKilled", "RingStartClosing"]. Frames without a type URL are dropped when set. Default is every frame.
+        :host: (str) The WebSocket server's address. Default is "127.0.0.1".
+        :port: (int) The WebSocket server's port. Default is 7777.
+        :source: (str) Optional. Only relay frames from the game client connected to this path on the server, i.e "lobby1". Default is the game client with no path.
+
+        ## Example
+
+        ```python
+        with LiveApex.Recorder("match.lapx") as recorder:
+            await LiveApex.Core.startRelay([recorder])
+        ```
+
+        ## Notes
+
+        The relay's connection turns off per-message compression, so the server sends frames as the game did and neither side spends time on deflate.
+        """
+
+        relays = [sink.relay for sink in sinks]
+        wanted = frozenset(f"{events.TYPE_URL_PREFIX}rtech.liveapi.{event_type}" for event_type in types) if types is not None else None
+        peekTypeURL = events.peekTypeURL
+
+        async with websockets.connect(f"ws://{host}:{port}/{source or ''}", compression=None) as websocket:
+            logger.info("Started WebSocket Relay")
+            async for raw_message in websocket:
+                received_at = time.time()
+                type_url = peekTypeURL(raw_message) if raw_message.__class__ is bytes else None
+                if wanted is not None and type_url not in wanted:
+                    continue
+
+                if metrics.enabled:
+                    metrics.count("relayed", events.typeName(type_url) if type_url is not None else "")
+
+                for relay in relays:
+                    relay(raw_message, type_url, received_at)
+
+    async def _consumeQueue(queue, deliver):
+        # Runs the callback for queued events, errors are reported so one bad event can't stop the queue
+        while True:
+            event_type, decoded_message, stamps = await queue.get()
+            try:
+                if stamps is not None:
+                    await Core._deliverMeasured(deliver, event_type, decoded_message, stamps)
+                else:
+                    await deliver(event_type, decoded_message)
+
+            except Exception as e:
+                logger.exception(f"Error in callback: {e}")
+
+            finally:
+                queue.done()
+
+    async def _drainQueue(queue, timeout):
+        # Let the callback finish the events still queued when the connection closed, the last events of a match included
+        try: await asyncio.wait_for(queue.join(), timeout)
+        except asyncio.TimeoutError:
+            dropped = queue.discard()
+            if dropped:
+                logger.warning(f"Dropped {dropped} queued events that were not handled within {timeout:.1f}s of the connection closing")
+
+    async def _deliverMeasured(deliver, event_type, decoded_message, stamps):
+        # stamps is (received, decoded) in perf_counter seconds
+        started = time.perf_counter()
+        await deliver(event_type, decoded_message)
+        finished = time.perf_counter()
+
+        metrics.observe("queue", event_type, started - stamps[1])
+        metrics.observe("callback", event_type, finished - started)
+        metrics.observe("total", event_type, finished - stamps[0])
+
+    def decodeSocketEvent(event: Any, pending = None, typed = False):
+        """
+        # Decode a WebSocket message
+
+        Decode a raw LiveAPIEvent frame into a dict.
+
+        ## Parameters
+
+        :event: (bytes) The raw frame received from the WebSocket server. JSON frames are handed to decodeJSONEvent.
+        :pending: (PendingRequests) Optional. Requests waiting on a reply, any matching reply in this frame resolves the oldest of them.
+        :typed: (bool) Return a LiveEvent wrapping the parsed message instead of a dict. Default is False.
+
+        ## Returns
+
+        The decoded event as a dict (or LiveEvent if typed), or None if the frame is not a LiveAPIEvent.
+        """
+
+        if isinstance(event, str) or event[:1] == b"{": # A JSON frame, sent when the game runs with +cl_liveapi_use_protobuf 0
+            return Core.decodeJSONEvent(event, typed = typed, pending = pending)
+
+        try:
+            # Parse event, reusing one outer message for every frame
+            live_api_event = Core._live_api_event
             live_api_event.ParseFromString(event)
 
             try:
-                result_type = live_api_event.gameMessage.TypeName()
+                game_message = live_api_event.gameMessage
+                type_url = game_message.type_url
 
                 # Filters
-                if result_type != "":
-                    if result_type == "rtech.liveapi.Response": # Response messages
-                        msg_result = symbol_database.Default().GetSymbol(result_type)()
-                        live_api_event.gameMessage.Unpack(msg_result)
-                        result = MessageToDict(msg_result)
-
-                        if result['success'] == True:
-                            # Required due to Respawn jank
-                            if "CustomMatch_SetSettings" in result['result']['@type']: # if setting is False that setting is not sent
-                                playlistName = result['result']['playlistName']
-                                adminChat = result['result'].get('adminChat', False)
-                                teamRename = result['result'].get('teamRename', False)
-                                selfAssign = result['result'].get('selfAssign', False)
-                                aimAssist = result['result'].get('aimAssist', False)
-                                anonMode = result['result'].get('anonMode', False)
-                                result = {
-                                    "playListName": playlistName,
-                                    "adminChat": adminChat,
-                                    "teamRename": teamRename,
-                                    "selfAssign": selfAssign,
-                                    "aimAssist": aimAssist,
-                                    "anonMode": anonMode,
-                                }
-                                return result
-
-                    else: # LiveAPIEvents
-                        msg_result = symbol_database.Default().GetSymbol(result_type)()
-                        live_api_event.gameMessage.Unpack(msg_result)
-                        result = MessageToDict(msg_result)
-                        return result
+                if type_url != "":
+                    unpack = events.getUnpacker(type_url)
+                    if unpack is None:
+                        raise Exception(f"Unknown message type {type_url}")
+
+                    decoded = events.LiveEvent(unpack(game_message.value))
+
+                    if pending is not None:
+                        Core._resolveReply(decoded, pending)
+
+                    if typed:
+                        return decoded
+
+                    return decoded.toDict()
 
                 else: # Assume sending to websocket
                     return None
 
             except Exception as e:
-                print(f"[LiveApexCore] Error decoding socket event: {e}")
+                logger.warning(f"Error decoding socket event: {e}")
+                return None
+
+        except (DecodeError, TypeError): # Not a LiveAPIEvent, i.e a command sent to the websocket or a text frame
+            return None
+
+    def decodeJSONEvent(event: Any, typed = False, pending = None):
+        """
+        # Decode a JSON WebSocket message
+
+        Decode a JSON frame, sent when the game runs with +cl_liveapi_use_protobuf 0, into the same dict (or LiveEvent) the protobuf path gives.
+        Frames are parsed with orjson when it is installed, otherwise the stdlib json module (see events.JSON_PARSER).
+
+        ## Parameters
+
+        :event: (str | bytes | dict) The raw frame, or the frame already parsed from JSON.
+        :typed: (bool) Return a LiveEvent wrapping the parsed message instead of a dict. Default is False.
+        :pending: (PendingRequests) Optional. Requests waiting on a reply, any matching reply in this frame resolves the oldest of them.
+
+        ## Returns
+
+        The decoded event as a dict (or LiveEvent if typed), or None if the frame is not a LiveAPI event.
+        """
+
+        try:
+            parsed = event if isinstance(event, dict) else events.loadJSON(event)
+            if '@type' not in parsed and 'gameMessage' in parsed: # A whole LiveAPIEvent
+                parsed = parsed['gameMessage']
+
+            type_url = parsed.get('@type', "")
+            message_class = events.message_classes.get(type_url[len(events.TYPE_URL_PREFIX):])
+            if message_class is None:
+                if type_url != "":
+                    logger.warning(f"Error decoding socket event: Unknown message type {type_url}")
                 return None
 
-        except: # If the event is a sent command to the websocket and not a LiveAPIEvent, ignore it
+            # The fields of the outer message sit next to @type, Any fields such as Response.result keep their own
+            decoded = events.LiveEvent(events.messageFromJSON(message_class, parsed))
+
+        except (ValueError, TypeError, AttributeError, ParseError) as e: # orjson.JSONDecodeError is a ValueError
+            logger.warning(f"Error decoding JSON socket event: {e}")
             return None
-    
+
+        if pending is not None:
+            Core._resolveReply(decoded, pending)
+
+        if typed:
+            return decoded
+
+        return decoded.toDict()
+
+    def _resolveReply(decoded, pending):
+        # Hand a reply to the oldest request waiting on it, some replies (i.e CustomMatch_LobbyPlayers) are sent as plain events
+        reply_type = decoded.replyType()
+        if not pending.isWaiting(reply_type):
+            return
+
+        if decoded.type == "Response" and not decoded.message.success:
+            pending.reject(reply_type, Exception(f"[LiveApexCore] requestFailed: The game client could not complete the request for {reply_type}"))
+        else:
+            pending.resolve(reply_type, decoded.reply())
+
+    # Reused by decodeSocketEvent, ParseFromString clears it before every frame
+    _live_api_event = events_pb2.LiveAPIEvent()
+
+    # Last known lobby state, kept up to date from the command connection
+    lobby_cache = LobbyCache()
+
+    # Shared connection used by sendWebSocketCommand and every Lobby function
+    command_client = CommandClient(decoder = decodeSocketEvent, watcher = lobby_cache.observe)
+
+    # Paces and orders the Lobby commands, sending through whichever command_client is current
+    command_scheduler = CommandScheduler(lambda command: Core.sendWebSocketCommand(command))
+
     async def sendWebSocketCommand(command: dict):
         """
         # Send a command to the WebSocket server
@@ -151,14 +461,110 @@ class Core:
 
         ## Parameters
 
-        :command: (dict) A dict containing the command to send and any data required. The format is as follows: {"commandName": {data}}
+        :command: (dict) A dict containing the command to send and any data required. The format is as follows: {"commandName": {data}}. commandName is any action field of the Request message in events.proto.
+
+        ## Example
+
+        ```python
+        await LiveApex.Core.sendWebSocketCommand({"customMatch_SendChat": {"text": "LiveApex"}})
+        ```
+
+        ## Notes
+
+        Commands are sent over a single shared connection (Core.command_client) that is opened on first use and reopened if it drops.
+        Several commands can be sent at once with asyncio.gather.
+        """
+
+        lobby_logger.debug(f"Sending {', '.join(command)}")
+        await Core.command_client.send(Core.buildRequest(command))
+
+    async def sendWebSocketRequest(command: dict, response_type: str, timeout = 10):
+        """
+        # Send a request to the WebSocket server
+
+        Send a command and wait for the game client to reply with a result of the given type.
+        Any number of requests can be awaited at the same time.
+
+        ## Parameters
+
+        :command: (dict) The command to send, in the same format as sendWebSocketCommand.
+        :response_type: (str) The full type name of the expected result, i.e rtech.liveapi.CustomMatch_LobbyPlayers.
+        :timeout: (float) Seconds to wait for the reply. Default is 10.
+
+        ## Example
+
+        ```python
+        lobby = await LiveApex.Core.sendWebSocketRequest({"customMatch_GetLobbyPlayers": {}}, "rtech.liveapi.CustomMatch_LobbyPlayers")
+        ```
+
+        ## Returns
+
+        The reply decoded as a dict.
+
+        ## Raises
+
+        TimeoutError | If the game client did not reply within timeout.
+        Exception | requestFailed, if the game client replied that the request failed.
+        """
+
+        lobby_logger.debug(f"Requesting {', '.join(command)}, awaiting {response_type}")
+        return await Core.command_client.request(Core.buildRequest(command), response_type, timeout)
+
+    def buildRequest(command: dict):
+        """
+        # Build a Request
+
+        Serialize a command dict into a LiveAPI Request message.
+
+        ## Parameters
+
+        :command: (dict) The command in the format {"commandName": {data}}.
+
+        ## Returns
+
+        The serialized Request as bytes.
+
+        ## Raises
+
+        google.protobuf.json_format.ParseError | If the command is not a valid Request.
+        """
+
+        return ParseDict(command, events_pb2.Request()).SerializeToString()
+
+    async def setCommandServer(host = "127.0.0.1", port = 7777, source = None):
+        """
+        # Set the command server
+
+        Point sendWebSocketCommand and every Lobby function at another server or source. The current command connection is closed.
+
+        ## Parameters
+
+        :host: (str) The WebSocket server's address. Default is "127.0.0.1".
+        :port: (int) The WebSocket server's port. Default is 7777.
+        :source: (str) Optional. The game client to command, see Core.startLiveAPI. Default is the game client with no path.
+
+        ## Example
+
+        ```python
+        await LiveApex.Core.setCommandServer(source = "lobby2")
+        ```
+        """
+
+        await Core.command_client.close()
+        Core.command_client = CommandClient(f"ws://{host}:{port}/{source or ''}", decoder = Core.decodeSocketEvent, watcher = Core.lobby_cache.observe)
+        Core.lobby_cache.invalidate() # A different lobby
+
+    async def closeCommandClient():
+        """
+        # Close the command connection
+
+        Close the shared connection used to send commands. It will be reopened by the next command.
 
         ## Example
 
         ```python
-        await LiveApex.Core.sendWebSocketCommand({customMatch_SendChat: {"text": "LiveApex"}})
+        await LiveApex.Core.closeCommandClient()
         ```
         """
 
-        async with websockets.connect(uri="ws://127.0.0.1:7777", ping_interval=20, ping_timeout=20) as websocket:
-            await websocket.send(json.dumps(command))
\ No newline at end of file
+        await Core.command_client.close()
\ No newline at end of file
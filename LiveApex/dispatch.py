@@ -0,0 +1,188 @@
+import asyncio
+from collections import deque
+
+### LiveApex Event Queue ###
+# Sits between the WebSocket and the callback so a slow handler never stalls reading #
+
+class EventQueue:
+    """
+    # Event Queue
+
+    A bounded queue between receiving frames and running the callback. Pass it to Core.startListener.
+    The listener keeps reading the WebSocket while the callback works through the queue.
+
+    ## Parameters
+
+    :maxsize: (int) The most events held at once. Default is 1024.
+    :policy: (str) What happens when the queue is full. Default is "block".
+        "block" stops reading the WebSocket until the callback catches up.
+        "drop-oldest" discards the oldest queued event.
+        "drop-newest" discards the incoming event.
+        "coalesce" replaces the queued event of the same type with the incoming one, or discards the oldest if there is none.
+
+    ## Example
+
+    ```python
+    queue = LiveApex.EventQueue(maxsize = 500, policy = "drop-oldest")
+    asyncio.create_task(LiveApex.Core.startListener(callback, queue = queue))
+    print(queue.stats())
+    ```
+    """
+
+    POLICIES = ("block", "drop-oldest", "drop-newest", "coalesce")
+
+    def __init__(self, maxsize = 1024, policy = "block"):
+        if policy not in EventQueue.POLICIES:
+            raise ValueError(f"[LiveApexQueue] policy expects one of {', '.join(EventQueue.POLICIES)}")
+        if not isinstance(maxsize, int) or maxsize < 1:
+            raise ValueError(f"[LiveApexQueue] maxsize expects int value above 0")
+
+        self.maxsize = maxsize
+        self.policy = policy
+        self._items = deque() # [event_type, event, stamps] entries
+        self._latest = {} # Event type -> newest queued entry, coalesce only
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._unfinished = 0 # Queued or being handled, see done
+        self._finished = asyncio.Event()
+        self._finished.set()
+
+        # Counters
+        self.received = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.high_water = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def stats(self):
+        """
+        # Stats
+
+        Returns the queue depth and counters as a dict.
+        """
+
+        return {
+            "depth": len(self._items),
+            "maxsize": self.maxsize,
+            "policy": self.policy,
+            "received": self.received,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "highWater": self.high_water,
+        }
+
+    async def put(self, event_type, event, stamps = None):
+        """
+        # Put
+
+        Queue an event, applying the queue's policy if it is full.
+
+        ## Parameters
+
+        :event_type: (str) The event type, i.e PlayerKilled.
+        :event: (dict | LiveEvent) The decoded event.
+        :stamps: (tuple) Optional. Metrics timestamps carried with the event.
+        """
+
+        self.received += 1
+
+        if len(self._items) >= self.maxsize:
+            if self.policy == "block":
+                while len(self._items) >= self.maxsize:
+                    self._not_full.clear()
+                    await self._not_full.wait()
+
+            elif self.policy == "drop-newest":
+                self.dropped += 1
+                return
+
+            elif self.policy == "drop-oldest":
+                self._popleft()
+                self._unfinished -= 1
+                self.dropped += 1
+
+            else: # coalesce
+                entry = self._latest.get(event_type)
+                if entry is not None:
+                    entry[1] = event
+                    entry[2] = stamps
+                    self.coalesced += 1
+                    return
+
+                self._popleft()
+                self._unfinished -= 1
+                self.dropped += 1
+
+        entry = [event_type, event, stamps]
+        self._items.append(entry)
+        self._unfinished += 1
+        self._finished.clear()
+        if self.policy == "coalesce":
+            self._latest[event_type] = entry
+
+        if len(self._items) > self.high_water:
+            self.high_water = len(self._items)
+
+        self._not_empty.set()
+
+    async def get(self):
+        """
+        # Get
+
+        Wait for the next event.
+
+        ## Returns
+
+        A tuple of (event_type, event, stamps).
+        """
+
+        while not self._items:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+
+        event_type, event, stamps = self._popleft()
+        self._not_full.set()
+        return event_type, event, stamps
+
+    def done(self):
+        """
+        # Done
+
+        Mark an event taken with get as handled.
+        """
+
+        self._unfinished -= 1
+        if self._unfinished <= 0:
+            self._finished.set()
+
+    async def join(self):
+        """
+        # Join
+
+        Wait until every queued event has been taken and marked done.
+        """
+
+        await self._finished.wait()
+
+    def discard(self):
+        """
+        # Discard
+
+        Drop every queued event, counting them as dropped. Returns how many were dropped.
+        """
+
+        count = len(self._items)
+        while self._items:
+            self._popleft()
+        self._unfinished -= count
+        self.dropped += count
+        self._not_full.set()
+        return count
+
+    def _popleft(self):
+        entry = self._items.popleft()
+        if self._latest.get(entry[0]) is entry:
+            del self._latest[entry[0]]
+        return entry
@@ -0,0 +1,147 @@
+from . import translator
+from . import events
+from .logger import getLogger
+
+### LiveApex Event Enricher ###
+# Adds display names for weapons, maps, playlists and datacenters to decoded events #
+
+logger = getLogger("Core")
+
+# Event type -> {field: (translator kind, added key)}, nested fields are dotted
+FIELDS = {
+    "MatchSetup": {
+        "map": ("map", "mapName"),
+        "playlistName": ("playlist", "playlistDisplayName"),
+        "datacenter.name": ("datacenter", "datacenterName"),
+    },
+    "Datacenter": {"name": ("datacenter", "displayName")},
+    "PlayerDamaged": {"weapon": ("weapon", "weaponName")},
+    "PlayerDowned": {"weapon": ("weapon", "weaponName")},
+    "PlayerKilled": {"weapon": ("weapon", "weaponName")},
+    "PlayerAssist": {"weapon": ("weapon", "weaponName")},
+    "WeaponSwitched": {
+        "oldWeapon": ("weapon", "oldWeaponName"),
+        "newWeapon": ("weapon", "newWeaponName"),
+    },
+}
+
+class Enricher:
+    """
+    # Enricher
+
+    Adds translated display names to events before they reach the callback, i.e event['weaponName'] == "R-99" next to event['weapon'] == "mp_weapon_r97".
+    Pass it to Core.startListener. Typed events expose the names as attributes, i.e event.weaponName.
+
+    Translations are memoized in a bounded cache. Names with no translation keep their internal name and are logged once instead of raising.
+
+    ## Parameters
+
+    :fields: (dict) Optional. The field map, {event_type: {field: (kind, added_key)}}. kind is "weapon", "map", "datacenter" or "playlist". Default is FIELDS.
+    :cache_size: (int) The most translations remembered. Default is 1024.
+
+    ## Example
+
+    ```python
+    await LiveApex.Core.startListener(callback, enricher = LiveApex.Enricher())
+    ```
+    """
+
+    def __init__(self, fields = None, cache_size = 1024):
+        if not isinstance(cache_size, int) or cache_size < 1:
+            raise ValueError(f"[LiveApexEnricher] cache_size expects int value above 0")
+
+        self.fields = {}
+        for event_type, field_map in (FIELDS if fields is None else fields).items():
+            for field, (kind, key) in field_map.items():
+                if kind not in translator.indexes:
+                    raise ValueError(f"[LiveApexEnricher] {event_type}.{field} kind expects one of {', '.join(translator.indexes)}")
+
+            # Split nested paths once here rather than per event
+            self.fields[event_type] = [(field.split("."), kind, key) for field, (kind, key) in field_map.items()]
+
+            # Dict events only carry their category
+            self.fields[event_type[:1].lower() + event_type[1:]] = self.fields[event_type]
+
+        self.cache_size = cache_size
+        self._cache = {} # (kind, internal name) -> display name
+        self._unknown = set() # (kind, internal name) already logged
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """
+        # Stats
+
+        Returns the cache size and counters as a dict.
+        """
+
+        return {
+            "cached": len(self._cache),
+            "cacheSize": self.cache_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "unknown": len(self._unknown),
+        }
+
+    def translate(self, kind, name):
+        """
+        # Translate
+
+        Translate one internal name through the cache. Unknown names are returned unchanged.
+        """
+
+        cache_key = (kind, name)
+        display_name = self._cache.get(cache_key)
+        if display_name is not None:
+            self.hits += 1
+            return display_name
+
+        self.misses += 1
+        display_name = translator.indexes[kind].get(name.lower())
+        if display_name is None:
+            display_name = name
+            if cache_key not in self._unknown:
+                self._unknown.add(cache_key)
+                logger.warning(f"No translation for {kind} {name!r}, passing it through")
+
+        if len(self._cache) >= self.cache_size:
+            del self._cache[next(iter(self._cache))] # Oldest first
+        self._cache[cache_key] = display_name
+        return display_name
+
+    def enrich(self, event):
+        """
+        # Enrich
+
+        Add the display names for one event in place.
+
+        ## Parameters
+
+        :event: (dict | LiveEvent) A decoded event.
+        """
+
+        if isinstance(event, events.LiveEvent):
+            field_maps = self.fields.get(event.type)
+            if field_maps is None:
+                return
+
+            for path, kind, key in field_maps:
+                value = event.message
+                for part in path:
+                    value = getattr(value, part)
+                if value:
+                    event.annotate(key, self.translate(kind, value))
+
+        else:
+            field_maps = self.fields.get(event.get('category', ""))
+            if field_maps is None:
+                return
+
+            for path, kind, key in field_maps:
+                value = event
+                for part in path:
+                    value = value.get(part, "") if isinstance(value, dict) else ""
+                if value:
+                    event[key] = self.translate(kind, value)
@@ -0,0 +1,356 @@
+import json
+from google.protobuf.descriptor import FieldDescriptor
+from google.protobuf.json_format import MessageToDict, ParseDict
+from . import events_pb2
+
+# JSON frames are parsed with orjson when it is installed, it is several times faster than the stdlib
+try:
+    import orjson
+    loadJSON = orjson.loads
+    JSON_PARSER = "orjson"
+
+    def dumpJSON(value):
+        return orjson.dumps(value).decode()
+
+except ImportError:
+    loadJSON = json.loads
+    JSON_PARSER = "json"
+
+    def dumpJSON(value):
+        return json.dumps(value, separators=(",", ":"))
+
+### LiveApex Event Registry ###
+# Maps every LiveAPI type URL to its message class, built once at import #
+
+TYPE_URL_PREFIX = "type.googleapis.com/"
+
+# Full name (rtech.liveapi.PlayerKilled) -> message class
+message_classes = {}
+
+# Type URL (type.googleapis.com/rtech.liveapi.PlayerKilled) -> message class
+message_types = {}
+
+# Type URL -> function(bytes) returning the parsed message, used in place of Any.Unpack
+unpackers = {}
+
+for _name, _descriptor in events_pb2.DESCRIPTOR.message_types_by_name.items():
+    _message_class = getattr(events_pb2, _name)
+    message_classes[_descriptor.full_name] = _message_class
+    message_types[TYPE_URL_PREFIX + _descriptor.full_name] = _message_class
+    unpackers[TYPE_URL_PREFIX + _descriptor.full_name] = _message_class.FromString
+
+RESPONSE_TYPE_URL = TYPE_URL_PREFIX + events_pb2.Response.DESCRIPTOR.full_name
+INIT_TYPE_URL = TYPE_URL_PREFIX + events_pb2.Init.DESCRIPTOR.full_name
+
+# Encoded type URL -> type URL, lets peekTypeURL skip decoding known types
+_type_urls_by_bytes = {type_url.encode(): type_url for type_url in message_types}
+
+# Wire tags used by peekTypeURL
+_GAME_MESSAGE_TAG = 0x1a # LiveAPIEvent.gameMessage, field 3, length delimited
+_TYPE_URL_TAG = 0x0a     # Any.type_url, field 1, length delimited
+
+def _readVarint(frame, position):
+    result = 0
+    shift = 0
+    while True:
+        byte = frame[position]
+        position += 1
+        result |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return result, position
+        shift += 7
+
+def _skipField(frame, position, tag):
+    wire_type = tag & 0x07
+    if wire_type == 0: # varint
+        return _readVarint(frame, position)[1]
+    if wire_type == 1: # fixed64
+        return position + 8
+    if wire_type == 2: # length delimited
+        length, position = _readVarint(frame, position)
+        return position + length
+    if wire_type == 5: # fixed32
+        return position + 4
+    raise ValueError(f"Unsupported wire type {wire_type}")
+
+def peekTypeURL(frame):
+    """
+    # Peek Type URL
+
+    Read the gameMessage type URL from a raw LiveAPIEvent frame without parsing the frame.
+
+    ## Parameters
+
+    :frame: (bytes) The raw frame received from the WebSocket server.
+
+    ## Returns
+
+    The type URL as a str, or None if the frame is not a LiveAPIEvent.
+    """
+
+    try:
+        position = 0
+        end = len(frame)
+        while position < end:
+            tag, position = _readVarint(frame, position)
+            if tag != _GAME_MESSAGE_TAG:
+                position = _skipField(frame, position, tag)
+                continue
+
+            length, position = _readVarint(frame, position)
+            message_end = position + length
+            while position < message_end:
+                tag, position = _readVarint(frame, position)
+                if tag != _TYPE_URL_TAG:
+                    position = _skipField(frame, position, tag)
+                    continue
+
+                length, position = _readVarint(frame, position)
+                type_url = bytes(frame[position:position + length])
+                known = _type_urls_by_bytes.get(type_url)
+                return known if known is not None else type_url.decode()
+
+            return None
+
+        return None
+
+    except (IndexError, ValueError, TypeError, UnicodeDecodeError):
+        return None
+
+def getUnpacker(type_url: str):
+    """
+    # Get Unpacker
+
+    Find the unpack function for a type URL.
+    Type URLs with an unexpected prefix are matched on their full message name.
+
+    ## Parameters
+
+    :type_url: (str) The type_url of a google.protobuf.Any.
+
+    ## Returns
+
+    A function that parses the Any's value into its message, or None if the type is unknown.
+    """
+
+    unpacker = unpackers.get(type_url)
+    if unpacker is None:
+        message_class = message_classes.get(type_url.rpartition("/")[2])
+        if message_class is not None:
+            unpacker = message_class.FromString
+            unpackers[type_url] = unpacker
+
+    return unpacker
+
+def typeName(type_url: str):
+    """
+    # Type Name
+
+    Get the short message name from a type URL, i.e PlayerKilled.
+    """
+
+    return type_url.rpartition(".")[2]
+
+## JSON Frames
+# Messages are built straight from the parsed JSON using a per-type plan of field names and conversions #
+# Anything the plan can't express (Any, bytes, maps) falls back to json_format.ParseDict #
+
+_INT64_TYPES = {FieldDescriptor.TYPE_INT64, FieldDescriptor.TYPE_UINT64, FieldDescriptor.TYPE_FIXED64, FieldDescriptor.TYPE_SFIXED64, FieldDescriptor.TYPE_SINT64}
+_FLOAT_TYPES = {FieldDescriptor.TYPE_FLOAT, FieldDescriptor.TYPE_DOUBLE}
+_json_plans = {} # Descriptor -> {json name: (field name, conversion, repeated)}
+
+class _NeedsParseDict(Exception):
+    pass
+
+def _jsonPlan(descriptor):
+    plan = _json_plans.get(descriptor)
+    if plan is None:
+        plan = {}
+        for field in descriptor.fields:
+            if field.message_type is not None:
+                if field.message_type.full_name == "google.protobuf.Any" or field.message_type.GetOptions().map_entry:
+                    conversion = _NeedsParseDict
+                else:
+                    conversion = field.message_type
+            elif field.type in _INT64_TYPES: # Sent as strings
+                conversion = int
+            elif field.type in _FLOAT_TYPES: # Can be "NaN" or "Infinity"
+                conversion = float
+            elif field.type == FieldDescriptor.TYPE_BYTES:
+                conversion = _NeedsParseDict
+            else:
+                conversion = None
+
+            repeated = field.is_repeated if hasattr(field, "is_repeated") else field.label == FieldDescriptor.LABEL_REPEATED
+            plan[field.json_name] = (field.name, conversion, repeated)
+
+        _json_plans[descriptor] = plan
+
+    return plan
+
+def _jsonFields(descriptor, data):
+    fields = {}
+    for key, value in data.items():
+        entry = _jsonPlan(descriptor).get(key)
+        if entry is None: # @type or a field this version doesn't know
+            continue
+
+        name, conversion, repeated = entry
+        if conversion is None:
+            fields[name] = value
+        elif conversion is int or conversion is float:
+            fields[name] = [conversion(item) for item in value] if repeated else conversion(value)
+        elif conversion is _NeedsParseDict:
+            raise _NeedsParseDict
+        else:
+            fields[name] = [_jsonFields(conversion, item) for item in value] if repeated else _jsonFields(conversion, value)
+
+    return fields
+
+def messageFromJSON(message_class, data: dict):
+    """
+    # Message From JSON
+
+    Build a message from its parsed JSON form, i.e a frame sent with +cl_liveapi_use_protobuf 0.
+
+    ## Raises
+
+    google.protobuf.json_format.ParseError | If data does not fit the message.
+    """
+
+    try:
+        return message_class(**_jsonFields(message_class.DESCRIPTOR, data))
+    except (_NeedsParseDict, TypeError, ValueError):
+        return ParseDict(data, message_class(), ignore_unknown_fields = True)
+
+def normalizeSettings(settings: dict):
+    """
+    # Normalize Settings
+
+    Fill in the custom match settings the game leaves out. If a setting is False it is not sent.
+
+    ## Parameters
+
+    :settings: (dict) A CustomMatch_SetSettings message as a dict.
+
+    ## Returns
+
+    A dict with playListName, adminChat, teamRename, selfAssign, aimAssist and anonMode.
+    """
+
+    return {
+        "playListName": settings.get('playlistName', ""),
+        "adminChat": settings.get('adminChat', False),
+        "teamRename": settings.get('teamRename', False),
+        "selfAssign": settings.get('selfAssign', False),
+        "aimAssist": settings.get('aimAssist', False),
+        "anonMode": settings.get('anonMode', False),
+    }
+
+class LiveEvent:
+    """
+    # Live Event
+
+    A lightweight wrapper around a parsed LiveAPI message.
+    Fields are read straight from the protobuf message, i.e event.weapon or event.attacker.nucleusHash.
+    The dict form used by the default listener is only built when asked for, then cached.
+
+    ## Example
+
+    ```python
+    async def callback(event):
+        if event.type == "PlayerKilled":
+            print(event.attacker.name, event.weapon)
+            print(event.toDict())
+    ```
+    """
+
+    __slots__ = ("message", "type", "_dict", "_extra")
+
+    def __init__(self, message):
+        self.message = message
+        self.type = message.DESCRIPTOR.name
+        self._dict = None
+        self._extra = None
+
+    def __getattr__(self, name):
+        try: return getattr(self.message, name)
+        except AttributeError:
+            if self._extra is not None and name in self._extra: # Added by annotate, i.e display names
+                return self._extra[name]
+            raise
+
+    def __repr__(self):
+        return f"LiveEvent({self.type})"
+
+    def toDict(self):
+        """
+        # To Dict
+
+        Convert the event to the dict shape returned by Core.decodeSocketEvent.
+        """
+
+        if self._dict is None:
+            result = MessageToDict(self.message)
+            if self.type == "Response" and result.get('success', False) == True:
+                # Required due to Respawn jank
+                if self.message.result.TypeName() == "rtech.liveapi.CustomMatch_SetSettings":
+                    result = normalizeSettings(result['result'])
+
+            if self._extra is not None:
+                result.update(self._extra)
+
+            self._dict = result
+
+        return self._dict
+
+    def annotate(self, key, value):
+        """
+        # Annotate
+
+        Attach an extra value to the event, readable as an attribute and included in toDict().
+        Message fields keep priority over annotations with the same name.
+        """
+
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+
+        if self._dict is not None:
+            self._dict[key] = value
+
+    def reply(self):
+        """
+        # Reply
+
+        The part of the event handed to a request waiting on it.
+        For Response messages this is the result, for anything else it is the whole event.
+        """
+
+        result = self.toDict()
+        if self.type != "Response" or "playListName" in result: # Plain events and normalized settings
+            return result
+
+        return result.get('result', {})
+
+    def replyType(self):
+        """
+        # Reply Type
+
+        The full type name a waiting request would expect for this event.
+        """
+
+        if self.type == "Response":
+            return self.message.result.TypeName()
+
+        return self.message.DESCRIPTOR.full_name
+
+    # Dict compatibility, these build the dict on first use
+    def __getitem__(self, key):
+        return self.toDict()[key]
+
+    def __contains__(self, key):
+        return key in self.toDict()
+
+    def get(self, key, default = None):
+        return self.toDict().get(key, default)
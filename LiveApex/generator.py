@@ -0,0 +1,429 @@
+import asyncio
+import random
+import time
+import websockets
+
+from . import events_pb2
+from . import translator
+from .logger import getLogger
+
+### LiveApex Synthetic Match Generator ###
+# Simulates LiveAPI traffic for load testing without the game installed #
+
+logger = getLogger("Core")
+
+LEGENDS = ["wraith", "bangalore", "bloodhound", "gibraltar", "lifeline", "pathfinder", "octane", "wattson", "caustic", "mirage", "horizon", "valkyrie", "seer", "ash", "catalyst", "crypto", "revenant", "loba", "rampart", "fuse", "newcastle", "vantage", "conduit", "ballistic", "alter"]
+AMMO_TYPES = ["bullet", "special", "highcal", "shotgun", "sniper", "arrows"]
+ITEMS = ["Light Rounds", "Heavy Rounds", "Energy Ammo", "Shotgun Shells", "Shield Cell", "Shield Battery", "Syringe", "Med Kit", "Phoenix Kit", "Frag Grenade", "Arc Star", "Thermite Grenade", "Extended Light Mag", "Barrel Stabilizer", "2x HCOG 'Bruiser'"]
+STATS = ["kills", "damageDealt", "knockdowns", "revivesGiven", "respawnsGiven", "survivalTime"]
+GAME_STATES = ["WaitingForPlayers", "PickLoadout", "Prematch", "Playing", "Resolution", "Postmatch"]
+
+# Relative frequency of mid-match events, tuned to look like a busy custom lobby
+EVENT_WEIGHTS = {
+    "PlayerDamaged": 30,
+    "AmmoUsed": 30,
+    "PlayerStatChanged": 12,
+    "InventoryPickUp": 8,
+    "InventoryUse": 6,
+    "InventoryDrop": 3,
+    "WeaponSwitched": 6,
+    "PlayerAbilityUsed": 3,
+    "ZiplineUsed": 1,
+    "GrenadeThrown": 1,
+}
+
+def wrapEvent(message):
+    """
+    # Wrap Event
+
+    Wrap a LiveAPI message in a LiveAPIEvent frame, as sent by the game client.
+
+    ## Returns
+
+    The frame as bytes.
+    """
+
+    live_api_event = events_pb2.LiveAPIEvent()
+    live_api_event.gameMessage.Pack(message)
+    return live_api_event.SerializeToString()
+
+class MatchGenerator:
+    """
+    # Match Generator
+
+    Simulates a full custom match: players connecting in squads, legend selection, ring phases,
+    damage, knocks, kills, squad eliminations and inventory churn, ending with a winning squad.
+
+    ## Parameters
+
+    :players: (int) Players in the match. Default is 60.
+    :squad_size: (int) Players per squad. Default is 3.
+    :duration: (float) Simulated match length in seconds. Default is 1200.
+    :events_per_second: (float) Mid-match events per simulated second. Default is 200.
+    :seed: (int) Optional. Seed for a repeatable match.
+    :start_time: (float) Optional. Unix timestamp the match starts at. Default is now.
+
+    ## Example
+
+    ```python
+    generator = LiveApex.MatchGenerator(seed = 1)
+    for timestamp, frame in generator.frames():
+        ...
+    ```
+    """
+
+    def __init__(self, players = 60, squad_size = 3, duration = 1200, events_per_second = 200, seed = None, start_time = None):
+        if not isinstance(players, int) or not isinstance(squad_size, int) or players < squad_size * 2 or squad_size < 1:
+            raise ValueError(f"[LiveApexGenerator] players expects int value of at least two squads")
+
+        self.players = players
+        self.squad_size = squad_size
+        self.duration = duration
+        self.events_per_second = events_per_second
+        self.start_time = time.time() if start_time is None else start_time
+        self.random = random.Random(seed)
+
+        # Roster, team ids start at 2 (0 is unassigned, 1 is observer)
+        self.roster = []
+        for index in range(players):
+            team_id = 2 + index // squad_size
+            self.roster.append(events_pb2.Player(
+                name=f"Player{index + 1:02d}",
+                teamId=team_id,
+                teamName=f"Team {team_id - 1}",
+                squadIndex=index % squad_size,
+                nucleusHash=f"{self.random.getrandbits(128):032x}",
+                hardwareName=self.random.choice(["PC-STEAM", "PC-ORIGIN", "PS4", "X1"]),
+                character=self.random.choice(LEGENDS),
+                currentHealth=100, maxHealth=100, shieldHealth=75, shieldMaxHealth=75,
+            ))
+
+    def _snapshot(self, player):
+        # Events carry a copy of the player as they were at that moment
+        snapshot = events_pb2.Player()
+        snapshot.CopyFrom(player)
+        snapshot.pos.x = self.random.uniform(-30000, 30000)
+        snapshot.pos.y = self.random.uniform(-30000, 30000)
+        snapshot.pos.z = self.random.uniform(0, 5000)
+        snapshot.angles.y = self.random.uniform(-180, 180)
+        return snapshot
+
+    def events(self):
+        """
+        # Events
+
+        Generate the match as LiveAPI messages in the order the game would send them.
+
+        ## Returns
+
+        An iterator of (timestamp, message) tuples. Timestamps are unix time in seconds.
+        """
+
+        rng = self.random
+        now = self.start_time
+        weapons = list(translator.weapons)
+        event_types = list(EVENT_WEIGHTS)
+        event_weights = list(EVENT_WEIGHTS.values())
+
+        yield now, events_pb2.Init(timestamp=int(now), category="init", gameVersion="v3.0.28.5", platform="PC", name="LiveApex Generator", apiVersion=events_pb2.Version(major_num=2, minor_num=4))
+        yield now, events_pb2.MatchSetup(
+            timestamp=int(now), category="matchSetup",
+            map=rng.choice(list(translator.maps)), playlistName="des_hu_cm", playlistDesc="Custom Match",
+            datacenter=events_pb2.Datacenter(timestamp=int(now), category="datacenter", name=rng.choice(list(translator.datacenters))),
+            aimAssistOn=True, serverId=f"{rng.getrandbits(64):016x}",
+        )
+        yield now, events_pb2.GameStateChanged(timestamp=int(now), category="gameStateChanged", state="WaitingForPlayers")
+
+        for player in self.roster:
+            now += rng.uniform(0.05, 0.5)
+            yield now, events_pb2.PlayerConnected(timestamp=int(now), category="playerConnected", player=self._snapshot(player))
+
+        for state in GAME_STATES[1:3]:
+            yield now, events_pb2.GameStateChanged(timestamp=int(now), category="gameStateChanged", state=state)
+        for player in self.roster:
+            yield now, events_pb2.CharacterSelected(timestamp=int(now), category="characterSelected", player=self._snapshot(player))
+
+        yield now, events_pb2.GameStateChanged(timestamp=int(now), category="gameStateChanged", state="Playing")
+
+        # Match loop
+        match_start = now
+        alive = {player.nucleusHash: player for player in self.roster}
+        downed = set()
+        squads_alive = {}
+        for player in self.roster:
+            squads_alive.setdefault(player.teamId, set()).add(player.nucleusHash)
+
+        ring_stages = 8
+        next_ring = 0
+        step = 1 / self.events_per_second
+
+        while len(squads_alive) > 1:
+            now += step
+            elapsed = now - match_start
+
+            # Ring phases, closing for the first half of each phase
+            if next_ring < ring_stages and elapsed >= next_ring * self.duration / ring_stages:
+                radius = 30000 * (1 - next_ring / ring_stages)
+                yield now, events_pb2.RingStartClosing(timestamp=int(now), category="ringStartClosing", stage=next_ring, currentRadius=radius, endRadius=radius * 0.6, shrinkDuration=self.duration / ring_stages / 2)
+                next_ring += 1
+            elif 0 < next_ring and elapsed >= (next_ring - 0.5) * self.duration / ring_stages and elapsed - step < (next_ring - 0.5) * self.duration / ring_stages:
+                radius = 30000 * (1 - (next_ring - 1) / ring_stages) * 0.6
+                yield now, events_pb2.RingFinishedClosing(timestamp=int(now), category="ringFinishedClosing", stage=next_ring - 1, currentRadius=radius, shrinkDuration=self.duration / ring_stages / 2)
+
+            players_alive = list(alive.values())
+            player = rng.choice(players_alive)
+            event_type = rng.choices(event_types, event_weights)[0]
+
+            if event_type == "PlayerDamaged":
+                victim = rng.choice(players_alive)
+                if victim.teamId == player.teamId:
+                    continue
+
+                # Only let fights turn lethal as often as needed to finish the match on time
+                planned_alive = self.players * max(0.0, 1 - elapsed / self.duration) ** 1.5
+                lethal = len(alive) > planned_alive
+                weapon = rng.choice(weapons)
+                damage = rng.randint(5, 45)
+                shield_damage = min(damage, victim.shieldHealth)
+                victim.shieldHealth -= shield_damage
+                health_damage = damage - shield_damage
+                if not lethal:
+                    health_damage = min(health_damage, victim.currentHealth - 1)
+                victim.currentHealth = max(0, victim.currentHealth - health_damage)
+
+                yield now, events_pb2.PlayerDamaged(timestamp=int(now), category="playerDamaged", attacker=self._snapshot(player), victim=self._snapshot(victim), weapon=weapon, damageInflicted=damage)
+
+                if victim.currentHealth == 0:
+                    if victim.nucleusHash not in downed and len(squads_alive[victim.teamId]) > 1:
+                        downed.add(victim.nucleusHash)
+                        victim.currentHealth = 30
+                        yield now, events_pb2.PlayerDowned(timestamp=int(now), category="playerDowned", attacker=self._snapshot(player), victim=self._snapshot(victim), weapon=weapon)
+                        continue
+
+                    # Killed
+                    downed.discard(victim.nucleusHash)
+                    del alive[victim.nucleusHash]
+                    squads_alive[victim.teamId].discard(victim.nucleusHash)
+                    yield now, events_pb2.PlayerKilled(timestamp=int(now), category="playerKilled", attacker=self._snapshot(player), victim=self._snapshot(victim), awardedTo=self._snapshot(player), weapon=weapon)
+                    yield now, events_pb2.PlayerStatChanged(timestamp=int(now), category="playerStatChanged", player=self._snapshot(player), statName="kills", newValue=rng.randint(1, 10))
+
+                    if not squads_alive[victim.teamId]:
+                        del squads_alive[victim.teamId]
+                        squad = [self._snapshot(member) for member in self.roster if member.teamId == victim.teamId]
+                        yield now, events_pb2.SquadEliminated(timestamp=int(now), category="squadEliminated", players=squad, placement=len(squads_alive) + 1)
+
+            elif event_type == "AmmoUsed":
+                old = rng.randint(1, 60)
+                used = rng.randint(1, min(old, 5))
+                yield now, events_pb2.AmmoUsed(timestamp=int(now), category="ammoUsed", player=self._snapshot(player), ammoType=rng.choice(AMMO_TYPES), amountUsed=used, oldAmmoCount=old, newAmmoCount=old - used)
+
+            elif event_type == "PlayerStatChanged":
+                yield now, events_pb2.PlayerStatChanged(timestamp=int(now), category="playerStatChanged", player=self._snapshot(player), statName=rng.choice(STATS), newValue=rng.randint(0, 3000))
+
+            elif event_type == "InventoryPickUp":
+                yield now, events_pb2.InventoryPickUp(timestamp=int(now), category="inventoryPickUp", player=self._snapshot(player), item=rng.choice(ITEMS), quantity=rng.randint(1, 60))
+
+            elif event_type == "InventoryUse":
+                # Heals keep non-lethal fights from wearing players down
+                player.shieldHealth = player.shieldMaxHealth
+                player.currentHealth = player.maxHealth if player.nucleusHash not in downed else player.currentHealth
+                yield now, events_pb2.InventoryUse(timestamp=int(now), category="inventoryUse", player=self._snapshot(player), item=rng.choice(["Shield Cell", "Shield Battery", "Syringe", "Med Kit"]), quantity=1)
+
+            elif event_type == "InventoryDrop":
+                yield now, events_pb2.InventoryDrop(timestamp=int(now), category="inventoryDrop", player=self._snapshot(player), item=rng.choice(ITEMS), quantity=rng.randint(1, 60))
+
+            elif event_type == "WeaponSwitched":
+                yield now, events_pb2.WeaponSwitched(timestamp=int(now), category="weaponSwitched", player=self._snapshot(player), oldWeapon=rng.choice(weapons), newWeapon=rng.choice(weapons))
+
+            elif event_type == "PlayerAbilityUsed":
+                yield now, events_pb2.PlayerAbilityUsed(timestamp=int(now), category="playerAbilityUsed", player=self._snapshot(player), linkedEntity=f"{player.character} tactical")
+
+            elif event_type == "ZiplineUsed":
+                yield now, events_pb2.ZiplineUsed(timestamp=int(now), category="ziplineUsed", player=self._snapshot(player), linkedEntity="zipline")
+
+            else: # GrenadeThrown
+                yield now, events_pb2.GrenadeThrown(timestamp=int(now), category="grenadeThrown", player=self._snapshot(player), linkedEntity=rng.choice(["Frag Grenade", "Arc Star", "Thermite Grenade"]))
+
+        # Winners
+        winners = [self._snapshot(player) for player in alive.values()]
+        yield now, events_pb2.SquadEliminated(timestamp=int(now), category="squadEliminated", players=winners, placement=1)
+        yield now, events_pb2.GameStateChanged(timestamp=int(now), category="gameStateChanged", state="Resolution")
+        yield now, events_pb2.MatchStateEnd(timestamp=int(now), category="matchStateEnd", state="Postmatch", winners=winners)
+
+    def frames(self):
+        """
+        # Frames
+
+        Generate the match as LiveAPIEvent frames.
+
+        ## Returns
+
+        An iterator of (timestamp, frame) tuples.
+        """
+
+        for timestamp, message in self.events():
+            yield timestamp, wrapEvent(message)
+
+    def writeCapture(self, path):
+        """
+        # Write Capture
+
+        Write the generated match to a capture file, for use with CaptureReader or Replay.
+
+        ## Returns
+
+        The number of frames written.
+        """
+
+        from .recorder import Recorder
+
+        with Recorder(path) as recorder:
+            for timestamp, frame in self.frames():
+                recorder.write(frame, timestamp)
+
+            return len(recorder)
+
+class FakeGameClient:
+    """
+    # Fake Game Client
+
+    Connects to the LiveApex WebSocket server as if it were the Apex client. It streams a generated match
+    and answers Request commands with Response messages, keeping its own lobby roster, settings and legend bans.
+
+    ## Parameters
+
+    :uri: (str) The WebSocket server to connect to. Default is "ws://127.0.0.1:7777".
+    :generator: (MatchGenerator) Optional. The match to stream. Default is a new MatchGenerator.
+    :rate: (float) Frames sent per second. 0 sends as fast as possible. Default is 200.
+
+    ## Example
+
+    ```python
+    client = LiveApex.FakeGameClient(rate = 2000)
+    asyncio.create_task(client.run())
+    players = await LiveApex.Lobby.getPlayers()
+    ```
+    """
+
+    def __init__(self, uri = "ws://127.0.0.1:7777", generator = None, rate = 200):
+        self.uri = uri
+        self.generator = MatchGenerator() if generator is None else generator
+        self.rate = rate
+
+        # Lobby state answered to requests
+        self.lobby_players = [events_pb2.CustomMatch_LobbyPlayer(name=player.name, teamId=player.teamId, nucleusHash=player.nucleusHash, hardwareName=player.hardwareName) for player in self.generator.roster]
+        self.teams = {team_id: events_pb2.CustomMatch_Team(id=team_id, name=f"Team {team_id - 1}") for team_id in sorted({player.teamId for player in self.generator.roster})}
+        self.settings = events_pb2.CustomMatch_SetSettings(playlistName="des_hu_cm", adminChat=True, teamRename=True, selfAssign=False, aimAssist=True, anonMode=False)
+        self.legend_bans = set()
+
+        # Counters
+        self.sent = 0
+        self.requests = 0
+        self.websocket = None
+
+    async def run(self, stream = True):
+        """
+        # Run
+
+        Connect, stream the match and keep answering requests until cancelled.
+
+        ## Parameters
+
+        :stream: (bool) Stream the generated match. If False the client only answers requests. Default is True.
+        """
+
+        async with websockets.connect(self.uri, max_size=None) as websocket:
+            self.websocket = websocket
+            stream_task = asyncio.create_task(self.stream()) if stream else None
+            try:
+                async for frame in websocket:
+                    reply = self.handleRequest(frame)
+                    if reply is not None:
+                        await websocket.send(reply)
+
+            finally:
+                if stream_task is not None:
+                    stream_task.cancel()
+
+    async def stream(self):
+        """
+        # Stream
+
+        Send the generated match at the configured rate.
+
+        ## Returns
+
+        The number of frames sent.
+        """
+
+        started = time.perf_counter()
+        for _, frame in self.generator.frames():
+            await self.websocket.send(frame)
+            self.sent += 1
+
+            if self.rate:
+                # Send in bursts against the start time, sleeping only when ahead of schedule
+                delay = started + self.sent / self.rate - time.perf_counter()
+                if delay > 0.001:
+                    await asyncio.sleep(delay)
+
+        logger.info(f"Fake game client finished streaming {self.sent} frames in {time.perf_counter() - started:.2f}s")
+        return self.sent
+
+    def handleRequest(self, frame):
+        """
+        # Handle Request
+
+        Build the reply the game would send to a Request frame.
+
+        ## Returns
+
+        The reply as a LiveAPIEvent frame, or None if the frame is not a Request or needs no reply.
+        """
+
+        if not isinstance(frame, bytes):
+            return None
+
+        request = events_pb2.Request()
+        try:
+            request.ParseFromString(frame)
+        except Exception:
+            return None
+
+        action = request.WhichOneof("actions")
+        if action is None:
+            return None
+
+        self.requests += 1
+        command = getattr(request, action)
+        result = None
+
+        if action == "customMatch_GetLobbyPlayers":
+            result = events_pb2.CustomMatch_LobbyPlayers(playerToken="fake", players=self.lobby_players, teams=self.teams.values())
+        elif action == "customMatch_GetSettings":
+            result = self.settings
+        elif action == "customMatch_GetLegendBanStatus":
+            result = events_pb2.CustomMatch_LegendBanStatus(legends=[events_pb2.LegendMatchStatus(name=legend.capitalize(), reference=legend, banned=legend in self.legend_bans) for legend in sorted(set(LEGENDS))])
+        elif action == "customMatch_SetSettings":
+            self.settings.CopyFrom(command)
+        elif action == "customMatch_SetLegendBan":
+            self.legend_bans = set(command.legendRefs)
+        elif action == "customMatch_SetTeam":
+            for player in self.lobby_players:
+                if player.nucleusHash == command.targetNucleusHash:
+                    player.teamId = command.teamId
+        elif action == "customMatch_KickPlayer":
+            self.lobby_players = [player for player in self.lobby_players if player.nucleusHash != command.targetNucleusHash]
+        elif action == "customMatch_SetTeamName":
+            self.teams.setdefault(command.teamId, events_pb2.CustomMatch_Team(id=command.teamId)).name = command.teamName
+        elif action == "customMatch_SetSpawnPoint":
+            self.teams.setdefault(command.teamId, events_pb2.CustomMatch_Team(id=command.teamId)).spawnPoint = command.spawnPoint
+
+        if result is None:
+            if not request.withAck:
+                return None
+            result = events_pb2.RequestStatus(status="success")
+
+        response = events_pb2.Response(success=True)
+        response.result.Pack(result)
+        return wrapEvent(response)
@@ -8,6 +8,12 @@ class Lobby:
     # Lobby
 
     This class contains functions to alter or get data on the lobby and it's players.
+
+    ## Notes
+
+    Commands go through Core.command_scheduler and return once the command has been sent. Wrap them in asyncio.create_task to queue a command without waiting.
+    Admin commands are sent ahead of chat, chat is paced to stay under the game's limit, and a command superseded before it was sent
+    (i.e a second setSettings, or a second setTeamName for the same team) is replaced by the newer one.
     """
 
     async def joinPartyServer():
@@ -29,7 +35,7 @@ class Lobby:
         ```
         """
 
-        Core.sendWebSocketCommand({"joinPartyServer": {}})
+        await Core.command_scheduler.submit({"joinPartyServer": {}})
 
     async def sendChatMessage(text):
         """
@@ -53,7 +59,7 @@ class Lobby:
         ```
         """
 
-        Core.sendWebSocketCommand({"customMatch_SendChat": {"text": str(text)}})
+        await Core.command_scheduler.submit({"customMatch_SendChat": {"text": str(text)}}, "chat") # Never coalesced, every message is sent
 
     async def togglePause(countdown):
         """
@@ -73,7 +79,7 @@ class Lobby:
         """
 
         if isinstance(countdown, int):
-            Core.sendWebSocketCommand({"customMatch_TogglePause": {"preTimer": str(countdown)}})
+            await Core.command_scheduler.submit({"pauseToggle": {"preTimer": countdown}}) # Never coalesced, two toggles are not one
         else:
             raise ValueError(f"[customMatch_TogglePause] countdown expects int value")
 
@@ -90,7 +96,7 @@ class Lobby:
         ```
         """
 
-        Core.sendWebSocketCommand({"customMatch_CreateLobby": {}})
+        await Core.command_scheduler.submit({"customMatch_CreateLobby": {}})
 
     async def joinLobby(lobby_code):
         """
@@ -110,7 +116,7 @@ class Lobby:
         """
 
         if isinstance(lobby_code, str):
-            Core.sendWebSocketCommand({"customMatch_JoinLobby": {"roleToken": lobby_code}})
+            await Core.command_scheduler.submit({"customMatch_JoinLobby": {"roleToken": lobby_code}})
         else:
             raise ValueError(f"[customMatch_JoinLobby] lobby_code expects str value")
 
@@ -127,7 +133,7 @@ class Lobby:
         ```
         """
 
-        Core.sendWebSocketCommand({"customMatch_LeaveLobby": {}})
+        await Core.command_scheduler.submit({"customMatch_LeaveLobby": {}})
 
     async def setReady(ready):
         """
@@ -147,7 +153,7 @@ class Lobby:
         """
 
         if isinstance(ready, bool):
-            Core.sendWebSocketCommand({"customMatch_SetReady": {"isReady": ready}})
+            await Core.command_scheduler.submit({"customMatch_SetReady": {"isReady": ready}})
         else:
             raise ValueError(f"[customMatch_SetReady] ready expects bool value")
 
@@ -174,24 +180,45 @@ class Lobby:
         """
 
         if isinstance(team_id, int) and isinstance(team_name, str):
-            Core.sendWebSocketCommand({"customMatch_SetTeamName": {"teamId": team_id, "teamName": team_name}})
+            await Core.command_scheduler.submit({"customMatch_SetTeamName": {"teamId": team_id, "teamName": team_name}}, key = ("customMatch_SetTeamName", team_id))
         else:
             raise ValueError(f"[customMatch_SetTeamName] One or more of the following values are invaild:\n   [customMatch_SetTeamName] team_id expects int value\n   [customMatch_SetTeamName] team_name expects str value")
 
-    async def getPlayers():
+    async def getPlayers(timeout = 10, refresh = False):
         """
         # Get Custom Match Players
 
-        Requests data for all custom match players.
+        Requests data for all custom match players. Answered from Core.lobby_cache while it is fresh.
+
+        ## Parameters
+
+        :timeout: (float) Seconds to wait for the game client to reply. Default is 10.
+        :refresh: (bool) Always ask the game client, skipping the cache. Default is False.
 
         ## Example
 
         ```python
-        await LiveApex.Lobby.getPlayers()
+        players = await LiveApex.Lobby.getPlayers()
         ```
+
+        ## Returns
+
+        A list of player dicts, each with name, teamId, nucleusHash and hardwareName.
+
+        ## Raises
+
+        TimeoutError | If the game client did not reply within timeout.
+        Exception | requestFailed, if the game client replied that the request failed.
         """
 
-        Core.sendWebSocketCommand({"customMatch_GetLobbyPlayers": {}})
+        if not refresh:
+            players = Core.lobby_cache.get(Core.lobby_cache.players)
+            if players is not None:
+                return [dict(player) for player in players.values()] # Copies, so callers can't change the cache
+
+        result = await Core.sendWebSocketRequest({"customMatch_GetLobbyPlayers": {}}, "rtech.liveapi.CustomMatch_LobbyPlayers", timeout)
+        Core.lobby_cache.store("rtech.liveapi.CustomMatch_LobbyPlayers", result)
+        return result.get('players', [])
 
     async def movePlayer(team_id, hardware_name, user_hash):
         """
@@ -213,7 +240,8 @@ class Lobby:
         """
 
         if isinstance(team_id, int) and isinstance(hardware_name, str) and isinstance(user_hash, str):
-            Core.sendWebSocketCommand({"customMatch_SetTeam": {"teamId": team_id, "targetHardwareName": hardware_name, "targetNucleusHash": user_hash}})
+            future = Core.command_scheduler.submit({"customMatch_SetTeam": {"teamId": team_id, "targetHardwareName": hardware_name, "targetNucleusHash": user_hash}}, key = ("customMatch_SetTeam", user_hash))
+            await Lobby._onSent(future, Core.lobby_cache.movePlayer, user_hash, team_id)
         else:
             raise ValueError(f"[customMatch_SetTeam] One or more of the following values are invaild:\n   [customMatch_SetTeam] team_id expects int value\n   [customMatch_SetTeam] hardware_name expects str value\n   [customMatch_SetTeam] user_hash expects str value")
 
@@ -236,24 +264,46 @@ class Lobby:
         """
 
         if isinstance(hardware_name, str) and isinstance(user_hash, str):
-            Core.sendWebSocketCommand({"customMatch_KickPlayer": {"targetHardwareName": hardware_name, "targetNucleusHash": user_hash}})
+            future = Core.command_scheduler.submit({"customMatch_KickPlayer": {"targetHardwareName": hardware_name, "targetNucleusHash": user_hash}}, key = ("customMatch_KickPlayer", user_hash))
+            await Lobby._onSent(future, Core.lobby_cache.removePlayer, user_hash)
         else:
             raise ValueError(f"[customMatch_KickPlayer] One or more of the following values are invaild:\n   [customMatch_KickPlayer] hardware_name expects str value\n   [customMatch_KickPlayer] user_hash expects str value")
 
-    async def getSettings():
+    async def getSettings(timeout = 10, refresh = False):
         """
         # Get Custom Match Settings
 
-        Get current custom match settings.
+        Get current custom match settings. Answered from Core.lobby_cache while it is fresh.
+
+        ## Parameters
+
+        :timeout: (float) Seconds to wait for the game client to reply. Default is 10.
+        :refresh: (bool) Always ask the game client, skipping the cache. Default is False.
 
         ## Example
 
         ```python
-        await LiveApex.Lobby.getSettings()
+        settings = await LiveApex.Lobby.getSettings()
         ```
+
+        ## Returns
+
+        A dict with playListName, adminChat, teamRename, selfAssign, aimAssist and anonMode.
+
+        ## Raises
+
+        TimeoutError | If the game client did not reply within timeout.
+        Exception | requestFailed, if the game client replied that the request failed.
         """
 
-        Core.sendWebSocketCommand({"customMatch_GetSettings": {}})
+        if not refresh:
+            settings = Core.lobby_cache.get(Core.lobby_cache.settings)
+            if settings is not None:
+                return dict(settings) # A copy, so callers can't change the cache
+
+        result = await Core.sendWebSocketRequest({"customMatch_GetSettings": {}}, "rtech.liveapi.CustomMatch_SetSettings", timeout)
+        Core.lobby_cache.store("rtech.liveapi.CustomMatch_SetSettings", result)
+        return dict(result)
 
     async def setSettings(playlist_name, admin_chat, team_rename, self_assign, aim_assist, anon_mode):
         """
@@ -282,7 +332,9 @@ class Lobby:
         """
 
         if isinstance(playlist_name, str) and isinstance(admin_chat, bool) and isinstance(team_rename, bool) and isinstance(self_assign, bool) and isinstance(aim_assist, bool) and isinstance(anon_mode, bool):
-            Core.sendWebSocketCommand({"customMatch_SetSettings": {"playlistName": playlist_name, "adminChat": admin_chat, "teamRename": team_rename, "selfAssign": self_assign, "aimAssist": aim_assist, "anonMode": anon_mode}})
+            settings = {"playlistName": playlist_name, "adminChat": admin_chat, "teamRename": team_rename, "selfAssign": self_assign, "aimAssist": aim_assist, "anonMode": anon_mode}
+            future = Core.command_scheduler.submit({"customMatch_SetSettings": settings}, key = "customMatch_SetSettings")
+            await Lobby._onSent(future, Core.lobby_cache.setSettings, settings)
         else:
             raise ValueError(f"[customMatch_SetSettings] One or more of the following values are invaild:\n   [customMatch_SetSettings] playlist_name expects str value\n   [customMatch_SetSettings] admin_chat expects bool value\n   [customMatch_SetSettings] team_rename expects bool value\n   [customMatch_SetSettings] self_assign expects bool value\n   [customMatch_SetSettings] aim_assist expects bool value\n   [customMatch_SetSettings] anon_mode expects bool value")
 
@@ -311,26 +363,48 @@ class Lobby:
                 else: scan +=1
 
             if scan == 0: # If all items are str -> send to websocket
-                Core.sendWebSocketCommand({"customMatch_SetLegendBan": {"legendRefs": ''.join(bans)}})
+                future = Core.command_scheduler.submit({"customMatch_SetLegendBan": {"legendRefs": bans}}, key = "customMatch_SetLegendBan")
+                await Lobby._onSent(future, Core.lobby_cache.invalidateLegendBans)
             else:
                 raise ValueError(f"[customMatch_SetLegendBan] bans expects all list values to be str")
         else:
             raise ValueError(f"[customMatch_SetLegendBan] bans expects list value")
 
-    async def getLegendBans():
+    async def getLegendBans(timeout = 10, refresh = False):
         """
         # Get Legend Bans
 
-        Get list of current legend bans.
+        Get list of current legend bans. Answered from Core.lobby_cache while it is fresh.
+
+        ## Parameters
+
+        :timeout: (float) Seconds to wait for the game client to reply. Default is 10.
+        :refresh: (bool) Always ask the game client, skipping the cache. Default is False.
 
         ## Example
 
         ```python
-        await LiveApex.Lobby.getLegendBans()
+        legends = await LiveApex.Lobby.getLegendBans()
         ```
+
+        ## Returns
+
+        A list of legend dicts, each with name, reference and banned.
+
+        ## Raises
+
+        TimeoutError | If the game client did not reply within timeout.
+        Exception | requestFailed, if the game client replied that the request failed.
         """
 
-        Core.sendWebSocketCommand({"customMatch_GetLegendBanStatus": {}})
+        if not refresh:
+            legends = Core.lobby_cache.get(Core.lobby_cache.legend_bans)
+            if legends is not None:
+                return [dict(legend) for legend in legends] # Copies, so callers can't change the cache
+
+        result = await Core.sendWebSocketRequest({"customMatch_GetLegendBanStatus": {}}, "rtech.liveapi.CustomMatch_LegendBanStatus", timeout)
+        Core.lobby_cache.store("rtech.liveapi.CustomMatch_LegendBanStatus", result)
+        return result.get('legends', [])
 
     async def startGame(status):
         """
@@ -350,7 +424,7 @@ class Lobby:
         """
 
         if isinstance(status, bool):
-            Core.sendWebSocketCommand({"customMatch_SetMatchmaking": {"enabled": status}})
+            await Core.command_scheduler.submit({"customMatch_SetMatchmaking": {"enabled": status}})
         else:
             raise ValueError(f"[customMatch_SetMatchmaking] status expects bool value")
 
@@ -373,6 +447,15 @@ class Lobby:
         """
 
         if isinstance(team_id, int) and isinstance(drop_location, int):
-            Core.sendWebSocketCommand({"customMatch_SetSpawnPoint": {"teamId": team_id, "spawnPoint": drop_location}})
+            await Core.command_scheduler.submit({"customMatch_SetSpawnPoint": {"teamId": team_id, "spawnPoint": drop_location}}, key = ("customMatch_SetSpawnPoint", team_id))
         else:
-            raise ValueError(f"[customMatch_SetSpawnPoint] One or more of the following values are invaild:\n   [customMatch_SetSpawnPoint] team_id expects int value\n   [customMatch_SetSpawnPoint] drop_location expects int value")
\ No newline at end of file
+            raise ValueError(f"[customMatch_SetSpawnPoint] One or more of the following values are invaild:\n   [customMatch_SetSpawnPoint] team_id expects int value\n   [customMatch_SetSpawnPoint] drop_location expects int value")
+
+    def _onSent(future, patch, *args):
+        # Update Core.lobby_cache once the command has actually gone out, even if the caller stopped waiting
+        def done(future):
+            if not future.cancelled() and future.exception() is None:
+                patch(*args)
+
+        future.add_done_callback(done)
+        return future
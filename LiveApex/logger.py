@@ -0,0 +1,157 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+
+### LiveApex Logging ###
+# Every LiveApex component logs through here, records are written by a background thread so the event loop never blocks on output #
+
+COMPONENTS = ("Core", "Socket", "Lobby", "Trace")
+
+def getLogger(component: str):
+    """
+    # Get Logger
+
+    Get the logger for a LiveApex component, i.e Core, Socket or Lobby.
+    """
+
+    return logging.getLogger(f"LiveApex.{component}")
+
+class _ComponentFilter(logging.Filter):
+    # Gives records the [LiveApexCore] style prefix used throughout LiveApex
+    def filter(self, record):
+        record.component = record.name.replace(".", "")
+        record.unconfigured = not logging.getLogger().handlers # Checked now, output happens later on the background thread
+        return True
+
+class _UnconfiguredFilter(logging.Filter):
+    # The default stdout output steps aside once the application configures logging, records reach its handlers by propagation instead
+    def filter(self, record):
+        return getattr(record, "unconfigured", True)
+
+class FrameTrace:
+    """
+    # Frame Trace
+
+    Decides which raw frames are written to the LiveApex.Trace logger. Disabled by default.
+    """
+
+    def __init__(self):
+        self.every = 0
+        self._count = 0
+
+    def sample(self):
+        """
+        # Sample
+
+        Returns True if the current frame should be traced.
+        """
+
+        self._count += 1
+        if self._count >= self.every:
+            self._count = 0
+            return True
+        return False
+
+frame_trace = FrameTrace()
+
+_root = logging.getLogger("LiveApex")
+_queue = queue.SimpleQueue()
+_queue_handler = logging.handlers.QueueHandler(_queue)
+_queue_handler.addFilter(_ComponentFilter())
+_output_handler = logging.StreamHandler(sys.stdout)
+_output_handler.setFormatter(logging.Formatter("[%(component)s] %(message)s"))
+_output_handler.addFilter(_UnconfiguredFilter())
+_listener = logging.handlers.QueueListener(_queue, _output_handler, respect_handler_level=True)
+
+_root.addHandler(_queue_handler)
+_root.setLevel(logging.INFO)
+_listener.start()
+
+def _stopListener():
+    # Whichever listener is current at exit, setHandler replaces it
+    _listener.stop()
+
+atexit.register(_stopListener)
+
+class Logger:
+    """
+    # Logger
+
+    This class contains functions to configure LiveApex logging.
+    Output is written to stdout by a background thread. Nothing is logged per event unless frame tracing is enabled.
+    Records also propagate to the "LiveApex" logger's parents, so once the application configures logging (i.e logging.basicConfig) they go to its handlers instead of stdout.
+    """
+
+    def setLevel(level, component = None):
+        """
+        # Set Level
+
+        Set the logging level for all of LiveApex or for one component.
+
+        ## Parameters
+
+        :level: (int | str) A logging level, i.e logging.DEBUG or "WARNING".
+        :component: (str) Optional. One of Core, Socket, Lobby or Trace. Default is all components.
+
+        ## Example
+
+        ```python
+        LiveApex.Logger.setLevel("WARNING")
+        LiveApex.Logger.setLevel("DEBUG", "Socket")
+        ```
+        """
+
+        if component is None:
+            _root.setLevel(level)
+        elif component in COMPONENTS:
+            getLogger(component).setLevel(level)
+        else:
+            raise ValueError(f"[LiveApexLogger] component expects one of {', '.join(COMPONENTS)}")
+
+    def setHandler(handler: logging.Handler):
+        """
+        # Set Handler
+
+        Replace where LiveApex logs are written, i.e a logging.FileHandler. The handler still runs on the background thread.
+
+        ## Parameters
+
+        :handler: (logging.Handler) The handler to write records to.
+
+        ## Example
+
+        ```python
+        LiveApex.Logger.setHandler(logging.FileHandler("liveapex.log"))
+        ```
+        """
+
+        global _listener
+        _listener.stop()
+        _listener = logging.handlers.QueueListener(_queue, handler, respect_handler_level=True)
+        _listener.start()
+
+    def setFrameTrace(every: int):
+        """
+        # Set Frame Trace
+
+        Log every Nth raw frame received by the listener to LiveApex.Trace at DEBUG level.
+
+        ## Parameters
+
+        :every: (int) Trace one in every N frames. 0 disables tracing. Default is 0.
+
+        ## Example
+
+        ```python
+        LiveApex.Logger.setFrameTrace(100)
+        ```
+        """
+
+        if not isinstance(every, int) or every < 0:
+            raise ValueError(f"[LiveApexLogger] every expects int value of 0 or above")
+
+        frame_trace.every = every
+        frame_trace._count = 0
+        getLogger("Trace").setLevel(logging.DEBUG if every else logging.NOTSET)
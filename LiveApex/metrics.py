@@ -0,0 +1,230 @@
+import asyncio
+import json
+from bisect import bisect_left
+
+from .logger import getLogger
+
+### LiveApex Metrics ###
+# Optional per-stage latency histograms and counters, off by default #
+
+logger = getLogger("Core")
+
+# Checked on the hot path before any timestamp is taken
+enabled = False
+
+# Upper bounds of the latency buckets in seconds, the last bucket catches everything above
+BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+STAGES = {
+    "broadcast": "server received the frame -> written to a client",
+    "decode": "listener received the frame -> decoded",
+    "queue": "decoded -> callback started",
+    "callback": "callback started -> callback finished",
+    "total": "listener received the frame -> callback finished",
+}
+
+class Histogram:
+    """
+    # Histogram
+
+    Counts observations into fixed latency buckets.
+    """
+
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q):
+        """
+        # Quantile
+
+        Estimate a quantile from the buckets. Returns the upper bound of the bucket it falls in, in seconds.
+        """
+
+        if self.count == 0:
+            return 0.0
+
+        target = q * self.count
+        running = 0
+        for index, count in enumerate(self.counts):
+            running += count
+            if running >= target:
+                return BUCKETS[index] if index < len(BUCKETS) else float("inf")
+
+        return float("inf")
+
+    def toDict(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "buckets": dict(zip([*map(str, BUCKETS), "+Inf"], self.counts)),
+        }
+
+_histograms = {} # (stage, event_type) -> Histogram
+_counters = {} # (name, event_type) -> int
+
+def observe(stage, event_type, seconds):
+    """
+    # Observe
+
+    Record a latency for a stage. Callers check metrics.enabled first.
+    """
+
+    histogram = _histograms.get((stage, event_type))
+    if histogram is None:
+        histogram = _histograms[(stage, event_type)] = Histogram()
+    histogram.observe(seconds)
+
+def count(name, event_type, amount = 1):
+    """
+    # Count
+
+    Increment a counter. Callers check metrics.enabled first.
+    """
+
+    _counters[(name, event_type)] = _counters.get((name, event_type), 0) + amount
+
+class Metrics:
+    """
+    # Metrics
+
+    This class contains functions to collect and read per-stage latency metrics.
+    When disabled (the default) the listener and server skip all timing.
+    """
+
+    def enable():
+        """
+        # Enable
+
+        Start collecting metrics.
+
+        ## Example
+
+        ```python
+        LiveApex.Metrics.enable()
+        ```
+        """
+
+        global enabled
+        enabled = True
+
+    def disable():
+        """
+        # Disable
+
+        Stop collecting metrics. Collected values are kept until reset.
+        """
+
+        global enabled
+        enabled = False
+
+    def reset():
+        """
+        # Reset
+
+        Clear all collected metrics.
+        """
+
+        _histograms.clear()
+        _counters.clear()
+
+    def snapshot():
+        """
+        # Snapshot
+
+        Read the collected metrics.
+
+        ## Returns
+
+        A dict with "stages" ({stage: {event_type: histogram}}) and "counters" ({name: {event_type: value}}). Latencies are in seconds.
+        """
+
+        stages = {}
+        for (stage, event_type), histogram in _histograms.items():
+            stages.setdefault(stage, {})[event_type] = histogram.toDict()
+
+        counters = {}
+        for (name, event_type), value in _counters.items():
+            counters.setdefault(name, {})[event_type] = value
+
+        return {"enabled": enabled, "stages": stages, "counters": counters}
+
+    def prometheus():
+        """
+        # Prometheus
+
+        Render the collected metrics in the Prometheus text format.
+        """
+
+        lines = ["# TYPE liveapex_stage_seconds histogram"]
+        for (stage, event_type), histogram in sorted(_histograms.items()):
+            labels = f'stage="{stage}",event_type="{event_type}"'
+            running = 0
+            for bound, bucket_count in zip([*map(str, BUCKETS), "+Inf"], histogram.counts):
+                running += bucket_count
+                lines.append(f'liveapex_stage_seconds_bucket{{{labels},le="{bound}"}} {running}')
+            lines.append(f"liveapex_stage_seconds_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"liveapex_stage_seconds_count{{{labels}}} {histogram.count}")
+
+        lines.append("# TYPE liveapex_events_total counter")
+        for (name, event_type), value in sorted(_counters.items()):
+            lines.append(f'liveapex_events_total{{name="{name}",event_type="{event_type}"}} {value}')
+
+        return "\n".join(lines) + "\n"
+
+    async def startHTTPServer(host = "127.0.0.1", port = 9777):
+        """
+        # Start the metrics HTTP server
+
+        Serve the collected metrics over HTTP. /metrics returns the Prometheus text format, /metrics.json returns Metrics.snapshot().
+
+        ## Parameters
+
+        :host: (str) The address to listen on. Default is "127.0.0.1".
+        :port: (int) The port to listen on. Default is 9777.
+
+        ## Example
+
+        ```python
+        asyncio.create_task(LiveApex.Metrics.startHTTPServer())
+        ```
+        """
+
+        async def handle(reader, writer):
+            try:
+                request_line = await reader.readline()
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""): # Skip headers
+                    pass
+
+                parts = request_line.decode(errors="replace").split()
+                path = parts[1] if len(parts) > 1 else "/"
+
+                if path == "/metrics.json":
+                    status, content_type, body = "200 OK", "application/json", json.dumps(Metrics.snapshot())
+                elif path == "/metrics":
+                    status, content_type, body = "200 OK", "text/plain; version=0.0.4", Metrics.prometheus()
+                else:
+                    status, content_type, body = "404 Not Found", "text/plain", "Not Found\n"
+
+                encoded = body.encode()
+                writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\nContent-Length: {len(encoded)}\r\nConnection: close\r\n\r\n".encode() + encoded)
+                await writer.drain()
+
+            finally:
+                writer.close()
+
+        server = await asyncio.start_server(handle, host, port)
+        logger.info(f"Metrics server started on http://{host}:{port}/metrics")
+        async with server:
+            await server.serve_forever()
@@ -0,0 +1,223 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .core import Core
+from .logger import getLogger
+
+### LiveApex Decode Pool ###
+# Decodes frames in batches on worker processes so decoding is not limited to the event loop's core #
+
+logger = getLogger("Core")
+
+def decodeFrames(frames):
+    # Runs in a worker process
+    return [Core.decodeSocketEvent(frame) for frame in frames]
+
+class DecodePool:
+    """
+    # Decode Pool
+
+    A pool of worker processes that decode frames for Core.startListener. Frames are sent to the workers in batches,
+    so the cost of passing them between processes is shared by the whole batch. One pool can be shared by several listeners,
+    i.e one per lobby, and each listener still gets its events in the order they arrived.
+
+    Worth it when decoding is what limits a listener, i.e several busy lobbies on a machine with spare cores.
+    With a single core, or a single quiet lobby, decoding inline is faster.
+
+    ## Parameters
+
+    :workers: (int) Worker processes. Default is the number of CPUs.
+    :batch_size: (int) The most frames sent to a worker at once. Default is 128.
+    :max_delay: (float) Seconds a partial batch waits for more frames before it is sent anyway. Default is 0.005.
+    :max_batches: (int) Batches each listener can have in flight before it stops reading. Default is twice the workers.
+
+    ## Example
+
+    ```python
+    pool = LiveApex.DecodePool()
+    await asyncio.gather(
+        LiveApex.Core.startListener(callback, source = "lobby1", decode_pool = pool),
+        LiveApex.Core.startListener(callback, source = "lobby2", decode_pool = pool),
+    )
+    ```
+    """
+
+    def __init__(self, workers = None, batch_size = 128, max_delay = 0.005, max_batches = None):
+        if workers is not None and (not isinstance(workers, int) or workers < 1):
+            raise ValueError(f"[LiveApexPool] workers expects int value above 0")
+        if not isinstance(batch_size, int) or batch_size < 1:
+            raise ValueError(f"[LiveApexPool] batch_size expects int value above 0")
+
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.max_batches = max_batches or self.workers * 2
+        self._executor = None
+
+        # Counters
+        self.batches = 0
+        self.frames = 0
+
+    def stats(self):
+        """
+        # Stats
+
+        Returns the pool size and counters as a dict.
+        """
+
+        return {
+            "workers": self.workers,
+            "batchSize": self.batch_size,
+            "batches": self.batches,
+            "frames": self.frames,
+            "meanBatch": self.frames / self.batches if self.batches else 0.0,
+        }
+
+    def submit(self, frames):
+        """
+        # Submit
+
+        Send a batch of frames to a worker.
+
+        ## Returns
+
+        An asyncio future for the decoded events, in the same order as frames.
+        """
+
+        if self._executor is None: # Workers are started on first use
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        self.batches += 1
+        self.frames += len(frames)
+        return asyncio.get_running_loop().run_in_executor(self._executor, decodeFrames, frames)
+
+    def stream(self, handler):
+        """
+        # Stream
+
+        Create an ordered stream for one listener. handler(event_type, event, stamps) is awaited for every decoded frame, in arrival order.
+        event is None for frames that could not be decoded.
+        """
+
+        return DecodeStream(self, handler)
+
+    def close(self):
+        """
+        # Close
+
+        Stop the worker processes. Batches still being decoded are abandoned.
+        """
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+class DecodeStream:
+    """
+    # Decode Stream
+
+    Batches one listener's frames into a DecodePool and hands the results back in order. Created by DecodePool.stream.
+    """
+
+    def __init__(self, pool, handler):
+        self.pool = pool
+        self.handler = handler
+        self._frames = []
+        self._metas = [] # (event_type, stamps) for each frame in the open batch
+        self._batches = asyncio.Queue(maxsize=pool.max_batches) # (future, metas) in submission order
+        self._flush_timer = None
+        self._deliver_task = asyncio.create_task(self._deliver())
+
+    async def put(self, frame, event_type, stamps = None):
+        """
+        # Put
+
+        Add a frame to the open batch. Waits if the listener already has max_batches in flight.
+        """
+
+        self._frames.append(frame)
+        self._metas.append((event_type, stamps))
+
+        if len(self._frames) >= self.pool.batch_size:
+            await self.flush()
+        elif self._flush_timer is None:
+            self._flush_timer = asyncio.get_running_loop().call_later(self.pool.max_delay, self._flushLater)
+
+    def _flushLater(self):
+        self._flush_timer = None
+        if self._frames:
+            asyncio.create_task(self.flush())
+
+    async def flush(self):
+        """
+        # Flush
+
+        Send the open batch now.
+        """
+
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+        if not self._frames:
+            return
+
+        frames, metas = self._frames, self._metas
+        self._frames, self._metas = [], []
+        await self._batches.put((self.pool.submit(frames), metas))
+
+    async def _deliver(self):
+        while True:
+            future, metas = await self._batches.get()
+            try:
+                decoded = await future
+
+            except Exception as e:
+                logger.error(f"Failed to decode a batch of {len(metas)} frames: {e}")
+                self._batches.task_done()
+                continue
+
+            try:
+                for (event_type, stamps), decoded_message in zip(metas, decoded):
+                    try:
+                        await self.handler(event_type, decoded_message, stamps)
+
+                    except Exception as e:
+                        logger.exception(f"Error in callback: {e}")
+
+            finally:
+                self._batches.task_done()
+
+    async def drain(self, timeout):
+        """
+        # Drain
+
+        Send the open batch and wait for every batch in flight to be delivered, for up to timeout seconds.
+        Returns True if everything was delivered.
+        """
+
+        try:
+            await asyncio.wait_for(self._drain(), timeout)
+            return True
+
+        except asyncio.TimeoutError:
+            logger.warning(f"Dropped decoded frames that were not delivered within {timeout:.1f}s of the connection closing")
+            return False
+
+    async def _drain(self):
+        await self.flush()
+        await self._batches.join()
+
+    def close(self):
+        """
+        # Close
+
+        Stop delivering straight away. Frames not yet delivered are discarded, call drain first to deliver them.
+        """
+
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+        self._deliver_task.cancel()
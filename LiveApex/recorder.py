@@ -0,0 +1,397 @@
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+from . import events
+from .logger import getLogger
+
+### LiveApex Match Recorder ###
+# Appends raw frames to a capture file and reads them back without loading the whole match #
+
+logger = getLogger("Core")
+
+CAPTURE_MAGIC = b"LAPXCAP1"
+INDEX_MAGIC = b"LAPXIDX2" # Version 2 records the capture size the index was written for
+
+# Every frame is stored as: arrival timestamp (float64), frame length (uint32), flags (uint8), frame
+RECORD_HEADER = struct.Struct("<dIB")
+FLAG_TEXT = 0x01 # The frame was a str (JSON mode) and is stored utf-8 encoded
+
+class Recorder:
+    """
+    # Recorder
+
+    A listener sink that appends every raw frame to a length-prefixed capture file with its arrival time.
+    Frames are buffered and written by a background thread so the event loop never waits on the disk.
+    When closed, a sidecar index (path + ".idx") is written so CaptureReader can seek by event type or time.
+
+    ## Parameters
+
+    :path: (str) The capture file to create.
+    :buffer_size: (int) Bytes buffered before they are handed to the writer thread. Default is 256 KiB.
+
+    ## Example
+
+    ```python
+    with LiveApex.Recorder("match.lapx") as recorder:
+        await LiveApex.Core.startListener(callback, sinks = [recorder])
+    ```
+    """
+
+    def __init__(self, path, buffer_size = 256 * 1024):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.closed = False
+
+        self._buffer = bytearray()
+        self._offset = len(CAPTURE_MAGIC) # File offset of the next record
+        self._last_timestamp = 0.0
+
+        # Index, one entry per frame
+        self._offsets = array("Q")
+        self._timestamps = array("d")
+        self._type_ids = array("H")
+        self._type_table = {} # Type URL -> type id
+
+        self._file = open(path, "wb")
+        self._file.write(CAPTURE_MAGIC)
+
+        # An index left by an earlier capture at this path would describe the wrong frames
+        try: os.remove(path + ".idx")
+        except FileNotFoundError: pass
+        self._chunks = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._writeChunks, name="LiveApexRecorder", daemon=True)
+        self._writer.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def write(self, frame, received_at = None):
+        """
+        # Write
+
+        Append a raw frame to the capture.
+
+        ## Parameters
+
+        :frame: (bytes | str) The frame as received from the WebSocket server.
+        :received_at: (float) Optional. The arrival time as a unix timestamp. Default is now.
+        """
+
+        self.relay(frame, events.peekTypeURL(frame) if not isinstance(frame, str) else None, received_at)
+
+    def relay(self, frame, type_url, received_at = None):
+        """
+        # Relay
+
+        Append a raw frame whose type URL is already known, as Core.startRelay delivers them.
+
+        ## Parameters
+
+        :frame: (bytes | memoryview | str) The frame as received from the WebSocket server.
+        :type_url: (str) The frame's type URL, None if it has none.
+        :received_at: (float) Optional. The arrival time as a unix timestamp. Default is now.
+        """
+
+        if self.closed:
+            raise ValueError("[LiveApexRecorder] Recorder is closed")
+
+        if isinstance(frame, str):
+            frame = frame.encode()
+            flags = FLAG_TEXT
+        else:
+            flags = 0
+
+        if type_url is None:
+            type_url = ""
+
+        # Keep timestamps ordered so the index can be searched
+        timestamp = time.time() if received_at is None else received_at
+        if timestamp < self._last_timestamp:
+            timestamp = self._last_timestamp
+        self._last_timestamp = timestamp
+
+        type_id = self._type_table.get(type_url)
+        if type_id is None:
+            type_id = len(self._type_table)
+            self._type_table[type_url] = type_id
+
+        self._offsets.append(self._offset)
+        self._timestamps.append(timestamp)
+        self._type_ids.append(type_id)
+
+        self._buffer += RECORD_HEADER.pack(timestamp, len(frame), flags)
+        self._buffer += frame
+        self._offset += RECORD_HEADER.size + len(frame)
+
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """
+        # Flush
+
+        Hand buffered frames to the writer thread.
+        """
+
+        if self._buffer:
+            self._chunks.put(bytes(self._buffer))
+            self._buffer.clear()
+
+    def _writeChunks(self):
+        while True:
+            chunk = self._chunks.get()
+            if chunk is None:
+                break
+            self._file.write(chunk)
+
+    def close(self):
+        """
+        # Close
+
+        Write any buffered frames, close the capture and write its index.
+        """
+
+        if self.closed:
+            return
+
+        self.closed = True
+        self.flush()
+        self._chunks.put(None)
+        self._writer.join()
+        self._file.close()
+
+        writeIndex(self.path + ".idx", self._offset, list(self._type_table), self._offsets, self._timestamps, self._type_ids)
+        logger.info(f"Recorded {len(self._offsets)} frames to {self.path}")
+
+def writeIndex(path, capture_size, type_urls, offsets, timestamps, type_ids):
+    """
+    # Write Index
+
+    Write a capture index. Used by Recorder and CaptureReader.rebuildIndex.
+    """
+
+    with open(path, "wb") as file:
+        file.write(INDEX_MAGIC)
+        file.write(struct.pack("<Q", capture_size))
+        file.write(struct.pack("<I", len(type_urls)))
+        for type_url in type_urls:
+            encoded = type_url.encode()
+            file.write(struct.pack("<H", len(encoded)))
+            file.write(encoded)
+
+        file.write(struct.pack("<Q", len(offsets)))
+        file.write(offsets.tobytes())
+        file.write(timestamps.tobytes())
+        file.write(type_ids.tobytes())
+
+class CaptureReader:
+    """
+    # Capture Reader
+
+    Read a capture written by Recorder. The capture is memory-mapped, so only the frames you touch are read from disk.
+    If the index is missing (i.e the recorder was not closed) it is rebuilt by scanning the capture once.
+
+    ## Parameters
+
+    :path: (str) The capture file.
+
+    ## Example
+
+    ```python
+    with LiveApex.CaptureReader("match.lapx") as capture:
+        for timestamp, frame in capture.frames(types = ["PlayerKilled"], start = capture.startTime + 600):
+            print(timestamp, LiveApex.Core.decodeSocketEvent(frame))
+    ```
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._map[:len(CAPTURE_MAGIC)] != CAPTURE_MAGIC:
+            self.close()
+            raise ValueError(f"[LiveApexRecorder] {path} is not a LiveApex capture")
+
+        if not self._readIndex(path + ".idx"):
+            self.rebuildIndex()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __iter__(self):
+        return self.frames()
+
+    def _readIndex(self, index_path):
+        if not os.path.exists(index_path):
+            return False
+
+        with open(index_path, "rb") as file:
+            data = file.read()
+
+        if data[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+            return False
+
+        position = len(INDEX_MAGIC)
+        (capture_size,) = struct.unpack_from("<Q", data, position)
+        position += 8
+        if capture_size != len(self._map): # The capture was rewritten or grew after its index was written
+            return False
+
+        (type_count,) = struct.unpack_from("<I", data, position)
+        position += 4
+        type_urls = []
+        for _ in range(type_count):
+            (length,) = struct.unpack_from("<H", data, position)
+            position += 2
+            type_urls.append(data[position:position + length].decode())
+            position += length
+
+        (count,) = struct.unpack_from("<Q", data, position)
+        position += 8
+        self.offsets = array("Q", data[position:position + count * 8])
+        position += count * 8
+        self.timestamps = array("d", data[position:position + count * 8])
+        position += count * 8
+        self.type_ids = array("H", data[position:position + count * 2])
+        self.type_urls = type_urls
+        return True
+
+    def rebuildIndex(self):
+        """
+        # Rebuild Index
+
+        Scan the capture and rewrite its index.
+        """
+
+        self.offsets = array("Q")
+        self.timestamps = array("d")
+        self.type_ids = array("H")
+        type_table = {}
+
+        position = len(CAPTURE_MAGIC)
+        end = len(self._map)
+        while position + RECORD_HEADER.size <= end:
+            timestamp, length, flags = RECORD_HEADER.unpack_from(self._map, position)
+            frame_start = position + RECORD_HEADER.size
+            if frame_start + length > end: # Truncated final record
+                break
+
+            type_url = "" if flags & FLAG_TEXT else (events.peekTypeURL(self._map[frame_start:frame_start + length]) or "")
+            type_id = type_table.setdefault(type_url, len(type_table))
+
+            self.offsets.append(position)
+            self.timestamps.append(timestamp)
+            self.type_ids.append(type_id)
+            position = frame_start + length
+
+        self.type_urls = list(type_table)
+        writeIndex(self.path + ".idx", len(self._map), self.type_urls, self.offsets, self.timestamps, self.type_ids)
+
+    @property
+    def startTime(self):
+        return self.timestamps[0] if self.timestamps else 0.0
+
+    @property
+    def endTime(self):
+        return self.timestamps[-1] if self.timestamps else 0.0
+
+    def typeCounts(self):
+        """
+        # Type Counts
+
+        Returns a dict of event type -> number of frames of that type.
+        """
+
+        counts = [0] * len(self.type_urls)
+        for type_id in self.type_ids:
+            counts[type_id] += 1
+
+        return {events.typeName(type_url) or "Unknown": count for type_url, count in zip(self.type_urls, counts)}
+
+    def frame(self, position):
+        """
+        # Frame
+
+        Read a single frame by its position in the capture.
+
+        ## Returns
+
+        A tuple of (timestamp, frame). Text frames are returned as str.
+        """
+
+        timestamp, length, flags = RECORD_HEADER.unpack_from(self._map, self.offsets[position])
+        frame_start = self.offsets[position] + RECORD_HEADER.size
+        frame = self._map[frame_start:frame_start + length]
+        if flags & FLAG_TEXT:
+            frame = frame.decode()
+
+        return timestamp, frame
+
+    def seek(self, timestamp):
+        """
+        # Seek
+
+        Returns the position of the first frame received at or after the timestamp.
+        """
+
+        return bisect_left(self.timestamps, timestamp)
+
+    def frames(self, types = None, start = None, end = None):
+        """
+        # Frames
+
+        Iterate over frames in arrival order, optionally filtered by event type and time.
+
+        ## Parameters
+
+        :types: (list[str]) Optional. Event types to include, i.e ["PlayerKilled"].
+        :start: (float) Optional. Only frames received at or after this unix timestamp.
+        :end: (float) Optional. Only frames received at or before this unix timestamp.
+
+        ## Returns
+
+        An iterator of (timestamp, frame) tuples.
+        """
+
+        first = 0 if start is None else bisect_left(self.timestamps, start)
+        last = len(self.offsets) if end is None else bisect_right(self.timestamps, end)
+
+        if types is None:
+            for position in range(first, last):
+                yield self.frame(position)
+            return
+
+        wanted = {type_id for type_id, type_url in enumerate(self.type_urls) if events.typeName(type_url) in types}
+        type_ids = self.type_ids
+        for position in range(first, last):
+            if type_ids[position] in wanted:
+                yield self.frame(position)
+
+    def close(self):
+        """
+        # Close
+
+        Unmap and close the capture.
+        """
+
+        self._map.close()
+        self._file.close()
@@ -0,0 +1,86 @@
+import asyncio
+import time
+import websockets
+
+from .recorder import CaptureReader
+from .logger import getLogger
+
+### LiveApex Replay ###
+# Plays a capture back into the LiveApex WebSocket server as if it were the game client #
+
+logger = getLogger("Core")
+
+class Replay:
+    """
+    # Replay
+
+    This class contains functions to replay captures recorded with Recorder.
+    """
+
+    async def replayCapture(path, speed = 1.0, uri = "ws://127.0.0.1:7777", types = None, start = None, end = None):
+        """
+        # Replay Capture
+
+        Connect to the WebSocket server as the game client and send every frame of a capture,
+        keeping the original gaps between frames scaled by speed.
+
+        ## Parameters
+
+        :path: (str) The capture file to replay.
+        :speed: (float) Playback speed. 1 is real time, 4 is four times faster. 0 sends frames as fast as possible. Default is 1.
+        :uri: (str) The WebSocket server to send to. Default is "ws://127.0.0.1:7777".
+        :types: (list[str]) Optional. Only replay these event types, i.e ["PlayerKilled"].
+        :start: (float) Optional. Only replay frames received at or after this unix timestamp.
+        :end: (float) Optional. Only replay frames received at or before this unix timestamp.
+
+        ## Example
+
+        ```python
+        stats = await LiveApex.Replay.replayCapture("match.lapx", speed = 10)
+        ```
+
+        ## Returns
+
+        A dict with frames, bytes, seconds, framesPerSecond and maxBehind (the furthest playback fell behind schedule, in seconds).
+        """
+
+        if not isinstance(speed, (int, float)) or speed < 0:
+            raise ValueError(f"[LiveApexReplay] speed expects int or float value of 0 or above")
+
+        frames = 0
+        sent_bytes = 0
+        max_behind = 0.0
+
+        with CaptureReader(path) as capture:
+            async with websockets.connect(uri, max_size=None) as websocket:
+                logger.info(f"Replaying {len(capture)} frames from {path} at {'max' if speed == 0 else f'{speed}x'} speed")
+                started = time.perf_counter()
+                first_timestamp = None
+
+                for timestamp, frame in capture.frames(types, start, end):
+                    if speed:
+                        if first_timestamp is None:
+                            first_timestamp = timestamp
+
+                        # Schedule against the start so sleep overshoot never accumulates
+                        delay = started + (timestamp - first_timestamp) / speed - time.perf_counter()
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+                        elif -delay > max_behind:
+                            max_behind = -delay
+
+                    await websocket.send(frame)
+                    frames += 1
+                    sent_bytes += len(frame)
+
+                seconds = time.perf_counter() - started
+
+        stats = {
+            "frames": frames,
+            "bytes": sent_bytes,
+            "seconds": seconds,
+            "framesPerSecond": frames / seconds if seconds else 0.0,
+            "maxBehind": max_behind,
+        }
+        logger.info(f"Replayed {frames} frames in {seconds:.2f}s ({stats['framesPerSecond']:,.0f} frames/s)")
+        return stats
@@ -0,0 +1,115 @@
+from . import events
+
+### LiveApex Event Router ###
+# Forwards events only to the handlers subscribed to their type #
+
+class EventRouter:
+    """
+    # Event Router
+
+    Subscribe handlers to individual event types. Pass the router to Core.startListener in place of a callback.
+    Frames of a type nobody subscribed to are dropped before they are decoded.
+
+    ## Example
+
+    ```python
+    router = LiveApex.EventRouter()
+
+    @router.on("PlayerKilled", "RingStartClosing")
+    async def onEvent(event):
+        print(event)
+
+    await LiveApex.Core.startListener(router)
+    ```
+
+    ## Notes
+
+    Event types are the message names from events.proto, i.e PlayerKilled. Subscribe to "*" to receive every event.
+    Replies to commands arrive as "Response".
+    """
+
+    def __init__(self):
+        self._handlers = {} # Event type -> list of handlers
+        self._type_urls = set() # Type URLs with at least one handler
+
+    def on(self, *event_types):
+        """
+        # On
+
+        Decorator subscribing an async function to one or more event types.
+
+        ## Parameters
+
+        :event_types: (str) The event types to subscribe to.
+        """
+
+        def decorator(handler):
+            for event_type in event_types:
+                self.add(event_type, handler)
+            return handler
+
+        return decorator
+
+    def add(self, event_type, handler):
+        """
+        # Add
+
+        Subscribe an async function to an event type.
+
+        ## Parameters
+
+        :event_type: (str) The event type, i.e PlayerKilled, or "*" for every event.
+        :handler: (function) An async function taking a single event parameter.
+
+        ## Raises
+
+        ValueError | If the event type does not exist in events.proto.
+        """
+
+        if event_type != "*" and f"rtech.liveapi.{event_type}" not in events.message_classes:
+            raise ValueError(f"[LiveApexRouter] Unknown event type: {event_type}")
+
+        self._handlers.setdefault(event_type, []).append(handler)
+        self._type_urls.add(event_type if event_type == "*" else f"{events.TYPE_URL_PREFIX}rtech.liveapi.{event_type}")
+
+    def remove(self, event_type, handler):
+        """
+        # Remove
+
+        Unsubscribe a handler from an event type.
+        """
+
+        handlers = self._handlers.get(event_type, [])
+        if handler in handlers:
+            handlers.remove(handler)
+
+        if not handlers:
+            self._handlers.pop(event_type, None)
+            self._type_urls.discard(event_type if event_type == "*" else f"{events.TYPE_URL_PREFIX}rtech.liveapi.{event_type}")
+
+    def wants(self, type_url):
+        """
+        # Wants
+
+        Returns True if any handler is subscribed to the type URL.
+        """
+
+        return type_url in self._type_urls or "*" in self._type_urls
+
+    async def dispatch(self, event_type, event):
+        """
+        # Dispatch
+
+        Forward a decoded event to every handler subscribed to its type.
+
+        ## Parameters
+
+        :event_type: (str) The event type, i.e PlayerKilled.
+        :event: (dict | LiveEvent) The decoded event.
+        """
+
+        for handler in self._handlers.get(event_type, ()):
+            await handler(event)
+
+        for handler in self._handlers.get("*", ()):
+            await handler(event)
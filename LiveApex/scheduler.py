@@ -0,0 +1,210 @@
+import asyncio
+import time
+from collections import deque
+from .logger import getLogger
+
+### LiveApex Command Scheduler ###
+# Paces Lobby commands to the game's limits, admin commands ahead of chat #
+
+logger = getLogger("Lobby")
+
+LANES = ("admin", "chat") # Highest priority first
+
+class TokenBucket:
+    """
+    # Token Bucket
+
+    Allows bursts of up to capacity, refilled at rate tokens per second.
+    """
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self):
+        """
+        # Delay
+
+        Seconds until a token is available, 0 if one is available now.
+        """
+
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self._refill()
+        self.tokens -= 1
+
+class CommandScheduler:
+    """
+    # Command Scheduler
+
+    Sends Lobby commands in priority order without tripping the game's rate limits.
+    Admin commands always go ahead of chat. Chat is paced by a token bucket, as the game ignores chat after ~10 messages in quick succession.
+    A command queued with the same key as one still waiting replaces it, i.e repeated setSettings only sends the newest settings.
+    The newest command is sent from the end of the queue, so it never jumps ahead of commands queued after the one it replaced.
+
+    Used through the Lobby functions, which await the future from submit.
+
+    ## Parameters
+
+    :send: (function) An async function sending one command dict.
+    :chat_rate: (float) Chat messages per second once the burst is used up. Default is 1.
+    :chat_burst: (int) Chat messages that can be sent back to back. Default is 8, under the game's ~10.
+    """
+
+    def __init__(self, send, chat_rate = 1.0, chat_burst = 8):
+        self.send = send
+        self.chat_bucket = TokenBucket(chat_rate, chat_burst)
+        self._lanes = {lane: deque() for lane in LANES} # [key, command, future] entries
+        self._queued = {} # key -> entry still waiting to be sent
+        self._wake = None
+        self._task = None
+
+        # Counters
+        self.sent = 0
+        self.coalesced = 0
+        self.failed = 0
+
+    def stats(self):
+        """
+        # Stats
+
+        Returns the queued commands per lane and counters as a dict.
+        """
+
+        return {
+            "queued": {lane: len(entries) for lane, entries in self._lanes.items()},
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "failed": self.failed,
+            "chatTokens": self.chat_bucket.tokens,
+        }
+
+    def submit(self, command, lane = "admin", key = None):
+        """
+        # Submit
+
+        Queue a command to be sent.
+
+        ## Parameters
+
+        :command: (dict) The command, in the format of Core.sendWebSocketCommand.
+        :lane: (str) "admin" or "chat". Default is "admin".
+        :key: (hashable) Optional. Commands with the same key supersede each other while queued. None never coalesces, use it for commands whose order matters, i.e lobby and match state changes.
+
+        ## Returns
+
+        An asyncio future that resolves once the command has been sent, or raises if sending failed.
+        Commands that were coalesced share the future of the command that replaced them.
+        """
+
+        if lane not in self._lanes:
+            raise ValueError(f"[LiveApexScheduler] lane expects one of {', '.join(LANES)}")
+
+        self._ensureRunning()
+
+        future = None
+        if key is not None:
+            entry = self._queued.get(key)
+            if entry is not None and not entry[2].done():
+                self.coalesced += 1
+                logger.debug(f"Coalesced {', '.join(command)}")
+                if self._lanes[lane] and self._lanes[lane][-1] is entry: # Nothing queued after it, send the newest command in its place
+                    entry[1] = command
+                    return entry[2]
+
+                # Moving it would reorder it against the commands queued since, send it after them instead
+                self._lanes[lane].remove(entry)
+                future = entry[2]
+
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+        entry = [key, command, future]
+        self._lanes[lane].append(entry)
+        if key is not None:
+            self._queued[key] = entry
+
+        self._wake.set()
+        return future
+
+    def _ensureRunning(self):
+        # The sender task belongs to one event loop, start a new one if the loop changed or it stopped
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._task.get_loop() is loop:
+            return
+
+        self.close()
+        self._wake = asyncio.Event()
+        self._task = loop.create_task(self._run())
+
+    def _next(self):
+        # The next entry allowed to go now, or seconds to wait if only rate limited chat is queued
+        if self._lanes["admin"]:
+            return self._lanes["admin"].popleft(), 0.0
+
+        if self._lanes["chat"]:
+            delay = self.chat_bucket.delay()
+            if delay:
+                return None, delay
+
+            self.chat_bucket.take()
+            return self._lanes["chat"].popleft(), 0.0
+
+        return None, None
+
+    async def _run(self):
+        while True:
+            entry, delay = self._next()
+            if entry is None:
+                self._wake.clear()
+                try: await asyncio.wait_for(self._wake.wait(), delay) # Woken early by new commands, admin ones can go first
+                except asyncio.TimeoutError: pass
+                continue
+
+            key, command, future = entry
+            if key is not None and self._queued.get(key) is entry:
+                del self._queued[key]
+
+            if future.done(): # Cancelled by the caller
+                continue
+
+            try:
+                await self.send(command)
+                self.sent += 1
+                if not future.done():
+                    future.set_result(None)
+
+            except Exception as e:
+                self.failed += 1
+                logger.warning(f"Failed to send {', '.join(command)}: {e}")
+                if not future.done():
+                    future.set_exception(e)
+
+    def close(self):
+        """
+        # Close
+
+        Stop the sender. Commands still queued are cancelled.
+        """
+
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+        for entries in self._lanes.values():
+            for _, _, future in entries:
+                if not future.done() and not future.get_loop().is_closed():
+                    future.cancel()
+            entries.clear()
+
+        self._queued.clear()
@@ -1,35 +1,194 @@
 import asyncio
+import functools
+import time
 import websockets
+from collections import deque
+from urllib.parse import urlsplit
+from .logger import getLogger
+from . import events
+from . import metrics
 
 ## LiveApex WebSocket Server ##
 # This starts the WebSocket server for the LiveApex library #
 
-connected_clients = set()
+SLOW_CLIENT_POLICIES = ("drop-oldest", "disconnect")
 
-async def echo(websocket, path):
-    connected_clients.add(websocket)
+logger = getLogger("Socket")
+
+DEFAULT_SOURCE = "default"
+
+connected_clients = {} # websocket -> Subscriber
+sources = {} # Source name -> {websocket: Subscriber} for the connections tagged with it
+
+def sourceName(path):
+    """
+    # Source Name
+
+    The source a connection belongs to, taken from the path it connected to. ws://127.0.0.1:7777/lobby1 is "lobby1", no path is "default".
+    """
+
+    return urlsplit(path).path.strip("/") or DEFAULT_SOURCE
+
+class Subscriber:
+    """
+    # Subscriber
+
+    The outbound side of one connected client. Messages are queued per client and written by the client's own task,
+    so one slow client never holds up the others.
+
+    ## Parameters
+
+    :websocket: The client's connection.
+    :source: (str) The source the client connected to.
+    :max_queue: (int) The most messages queued for this client.
+    :slow_client_policy: (str) What to do once the queue is full. "drop-oldest" sheds the oldest queued message, "disconnect" closes the connection.
+    """
+
+    def __init__(self, websocket, source, max_queue, slow_client_policy):
+        self.websocket = websocket
+        self.source = source
+        self.max_queue = max_queue
+        self.slow_client_policy = slow_client_policy
+        self.queue = deque() # (message, received_at, event_type) entries, event_type is only set while metrics are enabled
+        self._ready = asyncio.Event()
+
+        # Counters
+        self.sent = 0
+        self.dropped = 0
+        self.lag = 0.0 # Seconds between the server receiving the last message and it being written to this client
+        self.max_lag = 0.0
+
+        self._close_task = None # Closing the connection under the disconnect policy
+        self._writer_task = asyncio.create_task(self._write())
+
+    def push(self, message, received_at, event_type = ""):
+        """
+        # Push
+
+        Queue a message for this client, applying the slow client policy if the queue is full.
+        """
+
+        if len(self.queue) >= self.max_queue:
+            self.dropped += 1
+            if self.slow_client_policy == "disconnect":
+                if self._writer_task is not None:
+                    logger.warning(f"Disconnecting slow client {self.websocket.remote_address}")
+                    self.close()
+                    self._close_task = asyncio.create_task(self.websocket.close(code=1008, reason="Client too slow")) # Kept so it isn't garbage collected before it runs
+                return
+
+            self.queue.popleft()
+
+        self.queue.append((message, received_at, event_type))
+        self._ready.set()
+
+    async def _write(self):
+        try:
+            while True:
+                while not self.queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+
+                message, received_at, event_type = self.queue.popleft()
+                await self.websocket.send(message)
+
+                self.sent += 1
+                self.lag = time.perf_counter() - received_at
+                if self.lag > self.max_lag:
+                    self.max_lag = self.lag
+                if metrics.enabled:
+                    metrics.observe("broadcast", event_type, self.lag)
+
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+    def close(self):
+        """
+        # Close
+
+        Stop the writer task. Queued messages are discarded.
+        """
+
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            self._writer_task = None
+
+        self.queue.clear()
+
+    def stats(self):
+        """
+        # Stats
+
+        Returns this client's queue depth, counters and lag as a dict.
+        """
+
+        return {
+            "address": self.websocket.remote_address,
+            "source": self.source,
+            "depth": len(self.queue),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "lag": self.lag,
+            "maxLag": self.max_lag,
+        }
+
+def clientStats(source = None):
+    """
+    # Client Stats
+
+    Returns Subscriber.stats() for every connected client, or only the clients of one source.
+    """
+
+    subscribers = connected_clients.values() if source is None else sources.get(source, {}).values()
+    return [subscriber.stats() for subscriber in subscribers]
+
+async def echo(websocket, path, max_queue = 1024, slow_client_policy = "drop-oldest"):
+    # Game clients and listeners that connect to the same path share a source, messages never cross sources
+    source = sourceName(path)
+    subscriber = Subscriber(websocket, source, max_queue, slow_client_policy)
+    connected_clients[websocket] = subscriber
+    peers = sources.setdefault(source, {})
+    peers[websocket] = subscriber
+    logger.debug(f"Client {websocket.remote_address} joined source {source}")
     try:
-        async for message in websocket: # Broadcast the message to all connected clients
-            tasks = [asyncio.create_task(client.send(message)) for client in connected_clients]
-            await asyncio.gather(*tasks)
+        async for message in websocket: # Forward the message to every other client of the same source
+            received_at = time.perf_counter()
+            event_type = ""
+            if metrics.enabled:
+                type_url = events.peekTypeURL(message) if isinstance(message, bytes) else None
+                event_type = events.typeName(type_url) if type_url else "Unknown"
+                metrics.count("broadcast", event_type)
+
+            for client, client_subscriber in peers.items():
+                if client is not websocket:
+                    client_subscriber.push(message, received_at, event_type)
 
-    except websockets.exceptions.ConnectionClosedOK: 
+    except websockets.exceptions.ConnectionClosed:
         pass
 
-    finally: 
-        connected_clients.remove(websocket)
+    finally:
+        del connected_clients[websocket]
+        del peers[websocket]
+        if not peers and sources.get(source) is peers:
+            del sources[source]
+        subscriber.close()
+
+async def main(max_queue = 1024, slow_client_policy = "drop-oldest", host = "127.0.0.1", port = 7777):
+    if slow_client_policy not in SLOW_CLIENT_POLICIES:
+        raise ValueError(f"[LiveApexSocket] slow_client_policy expects one of {', '.join(SLOW_CLIENT_POLICIES)}")
+
+    handler = functools.partial(echo, max_queue=max_queue, slow_client_policy=slow_client_policy)
 
-async def main():
     try:
-        print("[LiveApexSocket] Starting WebSocket Server")
+        logger.info("Starting WebSocket Server")
 
-        async with websockets.serve(echo, '127.0.0.1', '7777', open_timeout=None, ping_timeout=None):
-            print(f"[LiveApexSocket] WebSocket server started on ws://127.0.0.1:7777")
+        async with websockets.serve(handler, host, port, open_timeout=None, ping_timeout=None):
+            logger.info(f"WebSocket server started on ws://{host}:{port}")
             await asyncio.Future() # Run forever
 
     except OSError as e: # Another websocket instance is already running
-        if '10048' in str(e): 
+        if '10048' in str(e):
             raise Exception("[LiveApexSocket] existingInstance: Another websocket instance is already running")
 
-        else: 
-            raise e
\ No newline at end of file
+        else:
+            raise e
@@ -0,0 +1,490 @@
+from . import events
+from . import events_pb2
+
+### LiveApex Match State ###
+# A running model of the match kept up to date from the event stream #
+
+# Message names with a player field, used to keep health, shields and legends fresh
+PLAYER_EVENTS = frozenset(
+    name for name, message_class in events_pb2.DESCRIPTOR.message_types_by_name.items()
+    if "player" in message_class.fields_by_name and message_class.fields_by_name["player"].message_type is events_pb2.Player.DESCRIPTOR
+)
+
+def _field(source, name, default = None):
+    # Read a field from either a protobuf message or its dict form
+    if isinstance(source, dict):
+        return source.get(name, default)
+    return getattr(source, name)
+
+class PlayerRecord:
+    """
+    # Player Record
+
+    One player's running totals. Read the attributes directly, or use toDict().
+    """
+
+    __slots__ = ("nucleus_hash", "name", "team_id", "squad_index", "character", "hardware_name",
+                 "connected", "alive", "downed", "current_health", "shield_health",
+                 "kills", "assists", "downs", "revives", "damage_dealt", "damage_taken", "last_seen")
+
+    def __init__(self, nucleus_hash):
+        self.nucleus_hash = nucleus_hash
+        self.name = ""
+        self.team_id = 0
+        self.squad_index = 0
+        self.character = ""
+        self.hardware_name = ""
+        self.connected = True
+        self.alive = True
+        self.downed = False
+        self.current_health = 0
+        self.shield_health = 0
+        self.kills = 0
+        self.assists = 0
+        self.downs = 0
+        self.revives = 0
+        self.damage_dealt = 0
+        self.damage_taken = 0
+        self.last_seen = 0
+
+    def __repr__(self):
+        return f"PlayerRecord({self.name!r}, team={self.team_id}, alive={self.alive})"
+
+    def toDict(self):
+        return {
+            "nucleusHash": self.nucleus_hash,
+            "name": self.name,
+            "teamId": self.team_id,
+            "squadIndex": self.squad_index,
+            "character": self.character,
+            "hardwareName": self.hardware_name,
+            "connected": self.connected,
+            "alive": self.alive,
+            "downed": self.downed,
+            "currentHealth": self.current_health,
+            "shieldHealth": self.shield_health,
+            "kills": self.kills,
+            "assists": self.assists,
+            "downs": self.downs,
+            "revives": self.revives,
+            "damageDealt": self.damage_dealt,
+            "damageTaken": self.damage_taken,
+            "lastSeen": self.last_seen,
+        }
+
+class SquadRecord:
+    """
+    # Squad Record
+
+    One squad's members and running totals. Members are nucleus hashes, look them up with MatchState.player.
+    """
+
+    __slots__ = ("team_id", "name", "members", "alive", "kills", "damage_dealt", "placement", "eliminated")
+
+    def __init__(self, team_id):
+        self.team_id = team_id
+        self.name = ""
+        self.members = set()
+        self.alive = 0 # Living members, kept in step with PlayerRecord.alive
+        self.kills = 0
+        self.damage_dealt = 0
+        self.placement = 0
+        self.eliminated = False
+
+    def __repr__(self):
+        return f"SquadRecord({self.team_id}, alive={self.alive}, eliminated={self.eliminated})"
+
+    def toDict(self):
+        return {
+            "teamId": self.team_id,
+            "name": self.name,
+            "members": sorted(self.members),
+            "alive": self.alive,
+            "kills": self.kills,
+            "damageDealt": self.damage_dealt,
+            "placement": self.placement,
+            "eliminated": self.eliminated,
+        }
+
+class MatchState:
+    """
+    # Match State
+
+    Keeps a model of the match up to date from the event stream: players, squads, the ring and the game state.
+    Players are indexed by nucleusHash and squads by teamId, so lookups never walk the event history.
+    Pass it to Core.startListener and it is updated before each event reaches your callback, or feed it yourself with update().
+
+    ## Example
+
+    ```python
+    state = LiveApex.MatchState()
+
+    async def callback(event):
+        if event['category'] == "playerKilled":
+            squad = state.squad(event['victim']['teamId'])
+            print(f"{squad.name} has {squad.alive} left, {state.squads_alive} squads remain")
+
+    await LiveApex.Core.startListener(callback, state = state)
+    ```
+    """
+
+    def __init__(self):
+        self._handlers = {
+            "MatchSetup": self._onMatchSetup,
+            "GameStateChanged": self._onGameStateChanged,
+            "PlayerConnected": self._onPlayerConnected,
+            "PlayerDisconnected": self._onPlayerDisconnected,
+            "CharacterSelected": self._onPlayerEvent,
+            "PlayerDamaged": self._onPlayerDamaged,
+            "PlayerDowned": self._onPlayerDowned,
+            "PlayerKilled": self._onPlayerKilled,
+            "PlayerAssist": self._onPlayerAssist,
+            "PlayerRevive": self._onPlayerRevive,
+            "PlayerRespawnTeam": self._onPlayerRespawnTeam,
+            "SquadEliminated": self._onSquadEliminated,
+            "RingStartClosing": self._onRingStartClosing,
+            "RingFinishedClosing": self._onRingFinishedClosing,
+            "MatchStateEnd": self._onMatchStateEnd,
+        }
+        for event_type in PLAYER_EVENTS:
+            self._handlers.setdefault(event_type, self._onPlayerEvent)
+
+        self.reset()
+
+    def reset(self):
+        """
+        # Reset
+
+        Forget everything, ready for the next match.
+        """
+
+        self.players = {} # nucleusHash -> PlayerRecord
+        self.squads = {} # teamId -> SquadRecord
+        self.players_alive = 0
+        self.squads_alive = 0
+
+        self.state = ""
+        self.map = ""
+        self.playlist = ""
+        self.started_at = 0
+        self.ended_at = 0
+        self.winners = []
+        self.events = 0
+
+        # Ring
+        self.ring_stage = -1
+        self.ring_center = (0.0, 0.0, 0.0)
+        self.ring_radius = 0.0
+        self.ring_end_radius = 0.0
+        self.ring_closing = False
+
+    @property
+    def types(self):
+        """
+        The event types this state reads. Core.startListener always decodes these, even when an EventRouter does not subscribe to them.
+        """
+
+        return self._handlers.keys()
+
+    def update(self, event):
+        """
+        # Update
+
+        Apply one event to the state.
+
+        ## Parameters
+
+        :event: (dict | LiveEvent) A decoded event, as passed to a listener callback.
+        """
+
+        if event is None:
+            return
+
+        if isinstance(event, events.LiveEvent):
+            event_type = event.type
+            event = event.message
+        elif isinstance(event, dict):
+            category = event.get('category', "")
+            event_type = category[:1].upper() + category[1:]
+        else: # A parsed protobuf message
+            event_type = event.DESCRIPTOR.name
+
+        handler = self._handlers.get(event_type)
+        if handler is not None:
+            self.events += 1
+            handler(event)
+
+    # Lookups
+    def player(self, nucleus_hash):
+        """
+        # Player
+
+        Get a player's record by nucleusHash, or None if they have not been seen.
+        """
+
+        return self.players.get(nucleus_hash)
+
+    def squad(self, team_id):
+        """
+        # Squad
+
+        Get a squad's record by teamId, or None if it has not been seen.
+        """
+
+        return self.squads.get(team_id)
+
+    def teammates(self, nucleus_hash):
+        """
+        # Teammates
+
+        Get the records of everyone in a player's squad, including the player.
+        """
+
+        player = self.players.get(nucleus_hash)
+        if player is None or player.team_id not in self.squads:
+            return []
+
+        return [self.players[member] for member in self.squads[player.team_id].members]
+
+    def alivePlayers(self):
+        """
+        # Alive Players
+
+        Get the records of every living player.
+        """
+
+        return [player for player in self.players.values() if player.alive]
+
+    def aliveSquads(self):
+        """
+        # Alive Squads
+
+        Get the records of every squad with a living member.
+        """
+
+        return [squad for squad in self.squads.values() if squad.alive]
+
+    def toDict(self):
+        """
+        # To Dict
+
+        The whole state as a dict, i.e for sending to an overlay.
+        """
+
+        return {
+            "state": self.state,
+            "map": self.map,
+            "playlist": self.playlist,
+            "startedAt": self.started_at,
+            "endedAt": self.ended_at,
+            "playersAlive": self.players_alive,
+            "squadsAlive": self.squads_alive,
+            "ring": {
+                "stage": self.ring_stage,
+                "center": list(self.ring_center),
+                "radius": self.ring_radius,
+                "endRadius": self.ring_end_radius,
+                "closing": self.ring_closing,
+            },
+            "winners": list(self.winners),
+            "players": [player.toDict() for player in self.players.values()],
+            "squads": [squad.toDict() for squad in self.squads.values()],
+        }
+
+    # Record upkeep
+    def _player(self, source, timestamp = 0):
+        # The record for a Player message, created on first sight. Returns None for empty players (i.e world damage)
+        nucleus_hash = _field(source, 'nucleusHash', "") if source else ""
+        if not nucleus_hash:
+            return None
+
+        record = self.players.get(nucleus_hash)
+        if record is None:
+            record = self.players[nucleus_hash] = PlayerRecord(nucleus_hash)
+            self.players_alive += 1
+
+        record.name = _field(source, 'name', record.name) or record.name
+        record.character = _field(source, 'character', record.character) or record.character
+        record.hardware_name = _field(source, 'hardwareName', record.hardware_name) or record.hardware_name
+        record.squad_index = _field(source, 'squadIndex', 0)
+        record.current_health = _field(source, 'currentHealth', 0)
+        record.shield_health = _field(source, 'shieldHealth', 0)
+        if timestamp:
+            record.last_seen = timestamp
+
+        team_id = _field(source, 'teamId', 0)
+        if team_id != record.team_id:
+            self._moveSquad(record, team_id)
+
+        squad = self.squads.get(team_id)
+        if squad is not None and not squad.name:
+            squad.name = _field(source, 'teamName', "")
+
+        return record
+
+    def _moveSquad(self, record, team_id):
+        old_squad = self.squads.get(record.team_id)
+        if old_squad is not None:
+            old_squad.members.discard(record.nucleus_hash)
+            if record.alive:
+                self._squadAliveChanged(old_squad, -1)
+
+        record.team_id = team_id
+        squad = self.squads.get(team_id)
+        if squad is None:
+            squad = self.squads[team_id] = SquadRecord(team_id)
+
+        squad.members.add(record.nucleus_hash)
+        if record.alive:
+            self._squadAliveChanged(squad, 1)
+
+    def _squadAliveChanged(self, squad, change):
+        if squad.alive == 0 and change > 0:
+            self.squads_alive += 1
+        squad.alive += change
+        if squad.alive == 0 and change < 0:
+            self.squads_alive -= 1
+
+    def _setAlive(self, record, alive):
+        if record.alive == alive:
+            return
+
+        record.alive = alive
+        record.downed = False
+        self.players_alive += 1 if alive else -1
+
+        squad = self.squads.get(record.team_id)
+        if squad is not None:
+            self._squadAliveChanged(squad, 1 if alive else -1)
+            if alive:
+                squad.eliminated = False
+
+    # Handlers
+    def _onMatchSetup(self, event):
+        self.map = _field(event, 'map', "")
+        self.playlist = _field(event, 'playlistName', "")
+        self.started_at = int(_field(event, 'timestamp', 0))
+
+    def _onGameStateChanged(self, event):
+        self.state = _field(event, 'state', "")
+
+    def _onMatchStateEnd(self, event):
+        self.state = _field(event, 'state', self.state)
+        self.ended_at = int(_field(event, 'timestamp', 0))
+        self.winners = [record.nucleus_hash for record in map(self._player, _field(event, 'winners', ())) if record is not None]
+
+    def _onPlayerEvent(self, event):
+        self._player(_field(event, 'player'), int(_field(event, 'timestamp', 0)))
+
+    def _onPlayerConnected(self, event):
+        record = self._player(_field(event, 'player'), int(_field(event, 'timestamp', 0)))
+        if record is not None:
+            record.connected = True
+
+    def _onPlayerDisconnected(self, event):
+        record = self._player(_field(event, 'player'), int(_field(event, 'timestamp', 0)))
+        if record is not None:
+            record.connected = False
+            if not _field(event, 'isAlive', False):
+                self._setAlive(record, False)
+
+    def _onPlayerDamaged(self, event):
+        timestamp = int(_field(event, 'timestamp', 0))
+        damage = _field(event, 'damageInflicted', 0)
+
+        attacker = self._player(_field(event, 'attacker'), timestamp)
+        if attacker is not None:
+            attacker.damage_dealt += damage
+            squad = self.squads.get(attacker.team_id)
+            if squad is not None:
+                squad.damage_dealt += damage
+
+        victim = self._player(_field(event, 'victim'), timestamp)
+        if victim is not None:
+            victim.damage_taken += damage
+
+    def _onPlayerDowned(self, event):
+        timestamp = int(_field(event, 'timestamp', 0))
+
+        attacker = self._player(_field(event, 'attacker'), timestamp)
+        if attacker is not None:
+            attacker.downs += 1
+
+        victim = self._player(_field(event, 'victim'), timestamp)
+        if victim is not None:
+            victim.downed = True
+
+    def _onPlayerKilled(self, event):
+        timestamp = int(_field(event, 'timestamp', 0))
+
+        # awardedTo is who the kill counts for, the attacker can differ (i.e a bleed out)
+        awarded = self._player(_field(event, 'awardedTo'), timestamp) or self._player(_field(event, 'attacker'), timestamp)
+        if awarded is not None:
+            awarded.kills += 1
+            squad = self.squads.get(awarded.team_id)
+            if squad is not None:
+                squad.kills += 1
+
+        victim = self._player(_field(event, 'victim'), timestamp)
+        if victim is not None:
+            self._setAlive(victim, False)
+
+    def _onPlayerAssist(self, event):
+        assistant = self._player(_field(event, 'assistant'), int(_field(event, 'timestamp', 0)))
+        if assistant is not None:
+            assistant.assists += 1
+
+    def _onPlayerRevive(self, event):
+        timestamp = int(_field(event, 'timestamp', 0))
+
+        player = self._player(_field(event, 'player'), timestamp)
+        if player is not None:
+            player.revives += 1
+
+        revived = self._player(_field(event, 'revived'), timestamp)
+        if revived is not None:
+            revived.downed = False
+
+    def _onPlayerRespawnTeam(self, event):
+        timestamp = int(_field(event, 'timestamp', 0))
+        self._player(_field(event, 'player'), timestamp)
+
+        for teammate in _field(event, 'respawnedTeammates', ()):
+            record = self._player(teammate, timestamp)
+            if record is not None:
+                self._setAlive(record, True)
+
+    def _onSquadEliminated(self, event):
+        timestamp = int(_field(event, 'timestamp', 0))
+        placement = _field(event, 'placement', 0)
+        winner = placement == 1 # The last squad standing is reported with placement 1
+
+        squad = None
+        for member in _field(event, 'players', ()):
+            record = self._player(member, timestamp)
+            if record is None:
+                continue
+
+            if not winner:
+                self._setAlive(record, False)
+            squad = self.squads.get(record.team_id)
+
+        if squad is not None:
+            squad.placement = placement
+            squad.eliminated = not winner
+
+    def _onRingStartClosing(self, event):
+        center = _field(event, 'center')
+        self.ring_stage = _field(event, 'stage', 0)
+        self.ring_center = (_field(center, 'x', 0.0), _field(center, 'y', 0.0), _field(center, 'z', 0.0)) if center else self.ring_center
+        self.ring_radius = _field(event, 'currentRadius', 0.0)
+        self.ring_end_radius = _field(event, 'endRadius', 0.0)
+        self.ring_closing = True
+
+    def _onRingFinishedClosing(self, event):
+        center = _field(event, 'center')
+        self.ring_stage = _field(event, 'stage', 0)
+        self.ring_center = (_field(center, 'x', 0.0), _field(center, 'y', 0.0), _field(center, 'z', 0.0)) if center else self.ring_center
+        self.ring_radius = _field(event, 'currentRadius', 0.0)
+        self.ring_end_radius = self.ring_radius
+        self.ring_closing = False
@@ -0,0 +1,395 @@
+import queue
+import sqlite3
+import threading
+import time
+
+from . import events
+from . import events_pb2
+from .core import Core
+from .logger import getLogger
+
+### LiveApex Event Store ###
+# Writes events into SQLite in batched transactions from a background thread, and queries them back #
+
+logger = getLogger("Core")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    match_id TEXT NOT NULL,
+    received_at REAL NOT NULL,
+    timestamp INTEGER NOT NULL,
+    event_type TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS event_players (
+    event_id INTEGER NOT NULL,
+    match_id TEXT NOT NULL,
+    nucleus_hash TEXT NOT NULL,
+    role TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_match ON events (match_id, timestamp);
+CREATE INDEX IF NOT EXISTS events_type ON events (event_type, match_id, timestamp);
+CREATE INDEX IF NOT EXISTS events_received ON events (received_at);
+CREATE INDEX IF NOT EXISTS event_players_hash ON event_players (nucleus_hash, match_id);
+CREATE INDEX IF NOT EXISTS event_players_event ON event_players (event_id);
+"""
+
+def matchId(event):
+    """
+    # Match ID
+
+    The match id given to events from a MatchSetup event onwards, its serverId and timestamp.
+    """
+
+    return f"{event.get('serverId', '')}:{event.get('timestamp', 0)}"
+
+def eventPlayers(event):
+    """
+    # Event Players
+
+    Yields (role, nucleusHash) for every player in an event dict, i.e ("attacker", ...) and ("victim", ...) for PlayerKilled.
+    """
+
+    for role, value in event.items():
+        if isinstance(value, dict):
+            if 'nucleusHash' in value:
+                yield role, value['nucleusHash']
+
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, dict) and 'nucleusHash' in item:
+                    yield role, item['nucleusHash']
+
+class EventStore:
+    """
+    # Event Store
+
+    A listener sink that writes every event into a SQLite database for querying after the match.
+    Frames are only queued on the event loop, decoding and inserting happen on a background thread in one transaction per batch,
+    so a busy match never waits on the disk.
+
+    Events go into one events table (the event as JSON in data, queryable with SQLite's json_extract) indexed on match id, event type and time,
+    and an event_players table indexing every player in each event by nucleusHash and role (i.e attacker, victim). See EventQuery to read them back.
+
+    ## Parameters
+
+    :path: (str) The database file, created if it does not exist. Events are added to any already in it.
+    :match_id: (str) Optional. Store every event under this match id. Default is a new id from each MatchSetup, its serverId and timestamp.
+    :batch_size: (int) The most events inserted per transaction. Default is 1024.
+    :max_delay: (float) Seconds a partial batch waits for more events before it is written anyway. Default is 0.1.
+
+    ## Example
+
+    ```python
+    with LiveApex.EventStore("matches.db") as store:
+        await LiveApex.Core.startListener(callback, sinks = [store])
+    ```
+    """
+
+    def __init__(self, path, match_id = None, batch_size = 1024, max_delay = 0.1):
+        if not isinstance(batch_size, int) or batch_size < 1:
+            raise ValueError(f"[LiveApexStore] batch_size expects int value above 0")
+
+        self.path = path
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.closed = False
+        self._fixed_match_id = match_id
+        self.match_id = match_id or ""
+
+        self._live_api_event = events_pb2.LiveAPIEvent() # Only used by the writer thread
+        self._pending = queue.SimpleQueue() # (kind, item, type_url, received_at), None to stop
+
+        # Counters
+        self.written = 0
+        self.batches = 0
+        self.undecodable = 0
+
+        # Create the schema here so errors reach the caller
+        connection = sqlite3.connect(path)
+        try:
+            connection.executescript(SCHEMA)
+        finally:
+            connection.close()
+
+        self._writer = threading.Thread(target=self._writeBatches, name="LiveApexStore", daemon=True)
+        self._writer.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def stats(self):
+        """
+        # Stats
+
+        Returns the counters as a dict.
+        """
+
+        return {
+            "queued": self._pending.qsize(),
+            "written": self.written,
+            "batches": self.batches,
+            "undecodable": self.undecodable,
+        }
+
+    # Feeding
+    def write(self, frame, received_at = None):
+        """
+        # Write
+
+        Queue a raw frame, as Core.startListener delivers them to sinks.
+
+        ## Parameters
+
+        :frame: (bytes | str) The frame as received from the WebSocket server.
+        :received_at: (float) Optional. The arrival time as a unix timestamp. Default is now.
+        """
+
+        self.relay(frame, None, received_at)
+
+    def relay(self, frame, type_url, received_at = None):
+        """
+        # Relay
+
+        Queue a raw frame whose type URL is already known, as Core.startRelay delivers them.
+        """
+
+        if self.closed:
+            raise ValueError("[LiveApexStore] EventStore is closed")
+
+        self._pending.put(("frame", frame, type_url, time.time() if received_at is None else received_at))
+
+    def insert(self, event, received_at = None):
+        """
+        # Insert
+
+        Queue an event that is already decoded, i.e from a callback.
+
+        ## Parameters
+
+        :event: (dict | LiveEvent) A decoded event.
+        :received_at: (float) Optional. The arrival time as a unix timestamp. Default is now.
+        """
+
+        if self.closed:
+            raise ValueError("[LiveApexStore] EventStore is closed")
+
+        self._pending.put(("event", event, None, time.time() if received_at is None else received_at))
+
+    # Writer thread
+    def _decode(self, kind, item, type_url):
+        # Returns (event type, event dict), or None if the item is not a LiveAPI event
+        if kind == "event":
+            if isinstance(item, events.LiveEvent):
+                return item.type, item.toDict()
+
+            category = item.get('category', "")
+            return category[:1].upper() + category[1:], item
+
+        if isinstance(item, str):
+            decoded = Core.decodeJSONEvent(item, typed = True)
+            return (decoded.type, decoded.toDict()) if decoded is not None else None
+
+        if type_url is None:
+            type_url = events.peekTypeURL(item)
+        unpack = events.getUnpacker(type_url) if type_url is not None else None
+        if unpack is None: # Not a LiveAPIEvent, i.e a command sent to the websocket
+            return None
+
+        self._live_api_event.ParseFromString(item)
+        decoded = events.LiveEvent(unpack(self._live_api_event.gameMessage.value))
+        return decoded.type, decoded.toDict()
+
+    def _rows(self, batch):
+        # Returns [(event row without its id, [(nucleusHash, role)])], events that can't be stored are counted and skipped
+        rows = []
+        for kind, item, type_url, received_at in batch:
+            try:
+                decoded = self._decode(kind, item, type_url)
+                if decoded is None:
+                    self.undecodable += 1
+                    continue
+
+                event_type, event = decoded
+                match_id = matchId(event) if event_type == "MatchSetup" and self._fixed_match_id is None else self.match_id
+                row = (match_id, received_at, int(event.get('timestamp', 0)), event_type, events.dumpJSON(event))
+                players = list(eventPlayers(event))
+
+            except Exception as e:
+                logger.warning(f"Event store skipped an event it could not store: {e}")
+                self.undecodable += 1
+                continue
+
+            self.match_id = match_id
+            rows.append((row, players))
+
+        return rows
+
+    def _insert(self, connection, rows):
+        # One transaction per batch, SQLite assigns the ids so several stores can share a database
+        player_rows = []
+        with connection:
+            for row, players in rows:
+                event_id = connection.execute("INSERT INTO events (match_id, received_at, timestamp, event_type, data) VALUES (?, ?, ?, ?, ?)", row).lastrowid
+                player_rows.extend((event_id, row[0], nucleus_hash, role) for role, nucleus_hash in players)
+
+            connection.executemany("INSERT INTO event_players VALUES (?, ?, ?, ?)", player_rows)
+
+    def _writeBatches(self):
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA journal_mode = WAL") # Readers can query while the match is written
+        connection.execute("PRAGMA synchronous = NORMAL")
+
+        stopping = False
+        while not stopping:
+            # Block for the first item, then collect for up to max_delay or batch_size items
+            batch = []
+            item = self._pending.get()
+            deadline = time.monotonic() + self.max_delay
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try: item = self._pending.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty: break
+            stopping = item is None
+
+            if not batch:
+                continue
+
+            # Nothing in one batch may stop the writer, later events would stay queued forever
+            try:
+                rows = self._rows(batch)
+                self._insert(connection, rows)
+
+            except Exception as e:
+                logger.error(f"Event store failed to write a batch of {len(batch)} events: {e}")
+                continue
+
+            self.written += len(rows)
+            self.batches += 1
+
+        connection.close()
+
+    def close(self):
+        """
+        # Close
+
+        Write every queued event and close the database.
+        """
+
+        if self.closed:
+            return
+
+        self.closed = True
+        self._pending.put(None)
+        self._writer.join()
+        logger.info(f"Stored {self.written} events to {self.path}")
+
+class EventQuery:
+    """
+    # Event Query
+
+    Read events back from a database written by EventStore. Safe to use while the store is still writing.
+
+    ## Parameters
+
+    :path: (str) The database file.
+
+    ## Example
+
+    ```python
+    with LiveApex.EventQuery("matches.db") as query:
+        match_id = query.matches()[-1]['matchId']
+        for kill in query.events(match_id = match_id, event_type = "PlayerKilled"):
+            print(kill['attacker']['name'], kill['victim']['name'])
+    ```
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._connection.close()
+
+    def sql(self, query, params = ()):
+        """
+        # SQL
+
+        Run any SQL against the database.
+
+        ## Returns
+
+        The rows as a list of dicts keyed by column name.
+        """
+
+        cursor = self._connection.execute(query, params)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
+
+    def matches(self):
+        """
+        # Matches
+
+        Returns every match in the database, oldest first, as dicts with matchId, events, start and end (received_at unix timestamps).
+        """
+
+        return self.sql(
+            "SELECT match_id AS matchId, COUNT(*) AS events, MIN(received_at) AS start, MAX(received_at) AS end "
+            "FROM events GROUP BY match_id ORDER BY start"
+        )
+
+    def events(self, match_id = None, event_type = None, nucleus_hash = None, start = None, end = None, limit = None):
+        """
+        # Events
+
+        Returns stored events, oldest first, in the dict shape returned by Core.decodeSocketEvent.
+
+        ## Parameters
+
+        :match_id: (str) Optional. Only events from this match.
+        :event_type: (str) Optional. Only this event type, i.e "PlayerKilled".
+        :nucleus_hash: (str) Optional. Only events involving this player in any role.
+        :start: (float) Optional. Only events received at or after this unix timestamp.
+        :end: (float) Optional. Only events received before this unix timestamp.
+        :limit: (int) Optional. The most events returned.
+        """
+
+        clauses = []
+        params = []
+        if match_id is not None:
+            clauses.append("match_id = ?")
+            params.append(match_id)
+        if event_type is not None:
+            clauses.append("event_type = ?")
+            params.append(event_type)
+        if nucleus_hash is not None:
+            clauses.append("id IN (SELECT event_id FROM event_players WHERE nucleus_hash = ?)")
+            params.append(nucleus_hash)
+        if start is not None:
+            clauses.append("received_at >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("received_at < ?")
+            params.append(end)
+
+        query = "SELECT data FROM events"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY id"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        return [events.loadJSON(data) for data, in self._connection.execute(query, params)]
@@ -29,6 +29,16 @@ datacenters = {
     "us-west-2": "Oregon",
 }
 
+# Custom match playlists, {map_name}:{mode_name}
+playlists = {
+    "des_hu_cm": "World's Edge:Custom",
+    "canyonlands_hu_cm": "Kings Canyon:Custom",
+    "tropic_mu2_cm": "Storm Point:Custom",
+    "olympus_mu3_cm": "Olympus:Custom",
+    "divided_moon_mu1_cm": "Broken Moon:Custom",
+    "district_cm": "E-District:Custom",
+}
+
 ### MISSING MELEE HEIRLOOM VARIANTS
 weapons = {
     # GRENADES
@@ -156,13 +166,40 @@ weapon_untranslations = {
     'Sheila (Mobile)': 'mp_weapon_mounted_turret_placeable'
 }
 
+## Lookup Indexes
+# Lowercased internal -> common and common -> internal names, one dict per kind #
+indexes = {}
+
+def buildIndexes():
+    """
+    # Build Indexes
+
+    Rebuild the lookup indexes from the tables above. Runs at import, call it again after editing a table.
+    """
+
+    for kind, table in (("map", maps), ("datacenter", datacenters), ("weapon", weapons), ("playlist", playlists)):
+        index = {common.lower(): internal for internal, common in table.items()}
+        index.update({internal.lower(): common for internal, common in table.items()}) # Internal names win a clash, as before
+        indexes[kind] = index
+
+buildIndexes()
+
+_MISSING = object()
+
 class Translator:
     """
     # Translator
 
     This class contains functions to translate data from internal to common names.
+
+    ## Performance
+
+    Lookups use indexes built once at import, so a call costs one str.lower() and one dict lookup, well under 1µs.
+    The benchmark suite checks translateWeapon against Translator.PER_CALL_BUDGET_NS.
     """
 
+    PER_CALL_BUDGET_NS = 1000
+
     def translateDatacenter(datacenter: str):
         """
         # Translate Datacenter
@@ -184,16 +221,8 @@ class Translator:
         Exception: {datacenter} | If the datacenter parameter has no translations.
         """
 
-        datacenter_lower = datacenter.lower()
-        datacenters_lower = {k.lower(): v for k, v in datacenters.items()}
-        datacenters_values_lower = {v.lower(): k for k, v in datacenters.items()}
-        
-        if datacenter_lower in datacenters_lower:
-            return datacenters_lower[datacenter_lower]
-        elif datacenter_lower in datacenters_values_lower:
-            return datacenters_values_lower[datacenter_lower]
-        else:
-            raise Exception(f"Unknown datacenter: {datacenter}")
+        try: return indexes["datacenter"][datacenter.lower()]
+        except KeyError: raise Exception(f"Unknown datacenter: {datacenter}") from None
 
     def translateWeapon(weapon: str):
         """
@@ -216,16 +245,8 @@ class Translator:
         Exception: {weapon} | If the weapon parameter has no translations.
         """
 
-        weapon_lower = weapon.lower()
-        weapons_lower = {k.lower(): v for k, v in weapons.items()}
-        weapons_values_lower = {v.lower(): k for k, v in weapons.items()}
-        
-        if weapon_lower in weapons_lower:
-            return weapons_lower[weapon_lower]
-        elif weapon_lower in weapons_values_lower:
-            return weapons_values_lower[weapon_lower]
-        else:
-            raise Exception(f"Unknown weapon: {weapon}")
+        try: return indexes["weapon"][weapon.lower()]
+        except KeyError: raise Exception(f"Unknown weapon: {weapon}") from None
 
     def translateMap(map: str):
         """
@@ -248,16 +269,8 @@ class Translator:
         Exception: {map} | If the map parameter has no translations.
         """
 
-        map_lower = map.lower()
-        maps_lower = {k.lower(): v for k, v in maps.items()}
-        maps_values_lower = {v.lower(): k for k, v in maps.items()}
-        
-        if map_lower in maps_lower:
-            return maps_lower[map_lower]
-        elif map_lower in maps_values_lower:
-            return maps_values_lower[map_lower]
-        else:
-            raise Exception(f"Unknown map: {map}")
+        try: return indexes["map"][map.lower()]
+        except KeyError: raise Exception(f"Unknown map: {map}") from None
         
     def translatePlaylist(playlist: str, mode = None):
         """
@@ -273,7 +286,7 @@ class Translator:
         ## Example
 
         ```python
-        LiveApex.Translator.translatePlaylist('kings canyon', 'algs')
+        LiveApex.Translator.translatePlaylist('kings canyon', 'custom')
         ```
 
         ## Returns
@@ -285,26 +298,48 @@ class Translator:
         Exception: {playlist} | If the playlist parameter has no translations.
         """
 
-        if mode != None:
-            playlist_key = f"{playlist}:{mode}".lower()
-            playlists_lower = {k.lower(): v for k, v in playlists.items()}
-            playlists_values_lower = {v.lower(): k for k, v in playlists.items()}
-            
-            if playlist_key in playlists_lower:
-                return playlists_lower[playlist_key]
-            elif playlist_key in playlists_values_lower:
-                return playlists_values_lower[playlist_key]
-            else:                
-                raise Exception(f"Unknown playlist: {playlist}:{mode}")
-
-        else:
-            playlist_lower = playlist.lower()
-            playlists_lower = {k.lower(): v for k, v in playlists.items()}
-            playlists_values_lower = {v.lower(): k for k, v in playlists.items()}
-            
-            if playlist_lower in playlists_lower:
-                return playlists_lower[playlist_lower]
-            elif playlist_lower in playlists_values_lower:
-                return playlists_values_lower[playlist_lower]
-            else:
-                raise Exception(f"Unknown playlist: {playlist}")
\ No newline at end of file
+        key = f"{playlist}:{mode}" if mode != None else playlist
+
+        try: return indexes["playlist"][key.lower()]
+        except KeyError: raise Exception(f"Unknown playlist: {key}") from None
+
+    def translateMany(kind: str, names, default = _MISSING):
+        """
+        # Translate Many
+
+        Translates a batch of names of one kind in a single call.
+
+        ## Parameters
+
+        :kind: (str) What the names are. Either "weapon", "map", "datacenter" or "playlist".
+        :names: (iterable[str]) The names to translate. Each can be an internal or common name. Playlists with a mode are given as {playlist}:{mode}.
+        :default: Optional. Returned for names with no translation instead of raising.
+
+        ## Example
+
+        ```python
+        LiveApex.Translator.translateMany("weapon", ["mp_weapon_r97", "Kraber"])
+        ```
+
+        ## Returns
+
+        A list of translations in the same order as names.
+
+        ## Raises
+
+        ValueError | If kind is not one of the above.
+        Exception: {name} | If a name has no translation and no default is given.
+        """
+
+        index = indexes.get(kind)
+        if index is None:
+            raise ValueError(f"[LiveApexTranslator] kind expects one of {', '.join(indexes)}")
+
+        if default is not _MISSING:
+            return [index.get(name.lower(), default) for name in names]
+
+        translated = []
+        for name in names:
+            try: translated.append(index[name.lower()])
+            except KeyError: raise Exception(f"Unknown {kind}: {name}") from None
+        return translated
@@ -0,0 +1,59 @@
+### LiveApex Decode Benchmark ###
+# Compares Core.decodeSocketEvent against the previous symbol database lookup, and the typed LiveEvent path #
+# Run with: python benchmarks/decode.py #
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from google.protobuf import symbol_database
+from google.protobuf.json_format import MessageToDict
+from LiveApex import Core, events_pb2
+
+def buildFrame(message):
+    live_api_event = events_pb2.LiveAPIEvent()
+    live_api_event.gameMessage.Pack(message)
+    return live_api_event.SerializeToString()
+
+def buildFrames(count):
+    attacker = events_pb2.Player(name="Attacker", teamId=2, nucleusHash="a" * 32, hardwareName="PC-STEAM", character="wraith", currentHealth=100, maxHealth=100)
+    victim = events_pb2.Player(name="Victim", teamId=3, nucleusHash="b" * 32, hardwareName="PC-STEAM", character="bangalore", currentHealth=60, maxHealth=100)
+    samples = [
+        buildFrame(events_pb2.PlayerDamaged(timestamp=1, category="playerDamaged", attacker=attacker, victim=victim, weapon="mp_weapon_r97", damageInflicted=12)),
+        buildFrame(events_pb2.AmmoUsed(timestamp=1, category="ammoUsed", player=attacker, ammoType="bullet", amountUsed=1, oldAmmoCount=20, newAmmoCount=19)),
+        buildFrame(events_pb2.PlayerStatChanged(timestamp=1, category="playerStatChanged", player=attacker, statName="damageDealt", newValue=120)),
+    ]
+    return [samples[i % len(samples)] for i in range(count)]
+
+def legacyDecode(event):
+    # decodeSocketEvent before the type URL registry
+    live_api_event = events_pb2.LiveAPIEvent()
+    live_api_event.ParseFromString(event)
+    result_type = live_api_event.gameMessage.TypeName()
+    msg_result = symbol_database.Default().GetSymbol(result_type)()
+    live_api_event.gameMessage.Unpack(msg_result)
+    return MessageToDict(msg_result)
+
+def typedDecode(event):
+    # What a typed handler that only reads category pays
+    return Core.decodeSocketEvent(event, typed = True).category
+
+def measure(decode, frames):
+    start = time.perf_counter()
+    for frame in frames:
+        decode(frame)
+    return len(frames) / (time.perf_counter() - start)
+
+if __name__ == "__main__":
+    frames = buildFrames(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
+
+    before = measure(legacyDecode, frames)
+    after = measure(Core.decodeSocketEvent, frames)
+
+    typed = measure(typedDecode, frames)
+
+    print(f"before: {before:,.0f} frames/s")
+    print(f"after:  {after:,.0f} frames/s ({after / before:.2f}x)")
+    print(f"typed:  {typed:,.0f} frames/s ({typed / before:.2f}x)")
@@ -0,0 +1,458 @@
+### LiveApex Benchmark Suite ###
+# Measures decode, dispatch, fan-out, translation and command round-trip against local stand-ins #
+# Run with: python benchmarks/suite.py [--output results.json] [--compare baseline.json] [--only decode translator] #
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import websockets
+from google.protobuf import __version__ as protobuf_version
+from google.protobuf.any_pb2 import Any
+from google.protobuf.json_format import MessageToJson
+
+import LiveApex
+from LiveApex import Core, Lobby, Translator, events_pb2, server
+from LiveApex.generator import MatchGenerator, FakeGameClient, wrapEvent
+
+URI = "ws://127.0.0.1:7777"
+
+benchmarks = {} # Group name -> benchmark function
+
+def benchmark(group):
+    def decorator(function):
+        benchmarks[group] = function
+        return function
+    return decorator
+
+def result(name, metric, value, unit, budget = None):
+    # budget is the documented upper bound for value, checked after the run
+    entry = {"name": name, "metric": metric, "value": value, "unit": unit}
+    if budget is not None:
+        entry["budget"] = budget
+    return entry
+
+def percentiles(name, samples, unit = "ms", scale = 1000):
+    samples = sorted(samples)
+    return [
+        result(name, "p50", samples[len(samples) // 2] * scale, unit),
+        result(name, "p99", samples[min(len(samples) - 1, int(len(samples) * 0.99))] * scale, unit),
+        result(name, "mean", statistics.fmean(samples) * scale, unit),
+    ]
+
+def sampleMessages(count = 20000, seed = 1):
+    # A deterministic slice of a generated match, grouped by event type
+    messages = {}
+    for _, message in MatchGenerator(seed=seed, duration=120).events():
+        messages.setdefault(message.DESCRIPTOR.name, []).append(message)
+        if sum(len(group) for group in messages.values()) >= count:
+            break
+    return messages
+
+def packAny(message):
+    # JSON frames are the game message as an Any, fields next to @type
+    packed = Any()
+    packed.Pack(message)
+    return packed
+
+def timeLoop(function, items, minimum = 0.2):
+    # Repeat over items until at least minimum seconds have passed, returns calls per second
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        for item in items:
+            function(item)
+        calls += len(items)
+        elapsed = time.perf_counter() - start
+        if elapsed >= minimum:
+            return calls / elapsed
+
+async def startServer():
+    task = asyncio.create_task(server.main())
+    await asyncio.sleep(0.2)
+    return task
+
+async def pace(sent, started, rate):
+    # Sleep until the next frame is due, so latency measures processing rather than a flooded backlog
+    delay = started + sent / rate - time.perf_counter()
+    if delay > 0:
+        await asyncio.sleep(delay)
+    else:
+        await asyncio.sleep(0)
+
+async def stopTask(task):
+    # Wait for the task to unwind so the server's port is free again
+    task.cancel()
+    try: await task
+    except asyncio.CancelledError: pass
+
+@benchmark("decode")
+def benchmarkDecode():
+    results = []
+    for event_type, messages in sorted(sampleMessages().items()):
+        if len(messages) < 20:
+            continue
+
+        frames = [wrapEvent(message) for message in messages]
+        json_frames = [MessageToJson(packAny(message), indent=None) for message in messages]
+        results.append(result(f"decode.protobuf.{event_type}", "throughput", timeLoop(Core.decodeSocketEvent, frames), "frames/s"))
+        results.append(result(f"decode.protobufTyped.{event_type}", "throughput", timeLoop(lambda frame: Core.decodeSocketEvent(frame, typed = True), frames), "frames/s"))
+        results.append(result(f"decode.json.{event_type}", "throughput", timeLoop(Core.decodeJSONEvent, json_frames), "frames/s"))
+        results.append(result(f"decode.jsonTyped.{event_type}", "throughput", timeLoop(lambda frame: Core.decodeJSONEvent(frame, typed = True), json_frames), "frames/s"))
+    return results
+
+@benchmark("listener")
+async def benchmarkListener(frames = 2000, rate = 1000):
+    server_task = await startServer()
+    sent_at = {}
+    latencies = []
+    done = asyncio.Event()
+
+    async def callback(event):
+        if event is not None and event.type == "PlayerStatChanged":
+            latencies.append(time.perf_counter() - sent_at[event.newValue])
+            if len(latencies) == len(sent_at):
+                done.set()
+
+    listener_task = asyncio.create_task(Core.startListener(callback, typed = True))
+    await asyncio.sleep(0.2)
+
+    player = events_pb2.Player(name="Bench", teamId=2, nucleusHash="a" * 32, hardwareName="PC-STEAM")
+    batch = [wrapEvent(events_pb2.PlayerStatChanged(category="playerStatChanged", player=player, statName="damageDealt", newValue=index)) for index in range(frames * 2)]
+
+    async with websockets.connect(URI) as game:
+        # Latency at a steady rate
+        started = time.perf_counter()
+        for index in range(frames):
+            sent_at[index] = time.perf_counter()
+            await game.send(batch[index])
+            await pace(index + 1, started, rate)
+        await asyncio.wait_for(done.wait(), 30)
+        results = percentiles("listener.endToEnd", latencies)
+
+        # Throughput with the game client sending as fast as it can
+        done.clear()
+        started = time.perf_counter()
+        for index in range(frames, frames * 2):
+            sent_at[index] = time.perf_counter()
+            await game.send(batch[index])
+        await asyncio.wait_for(done.wait(), 30)
+        results.append(result("listener.endToEnd", "throughput", frames / (time.perf_counter() - started), "frames/s"))
+
+    await stopTask(listener_task)
+    await stopTask(server_task)
+    return results
+
+@benchmark("fanout")
+async def benchmarkFanout(frames = 1000, rate = 200):
+    results = []
+    payload = wrapEvent(events_pb2.PlayerDamaged(category="playerDamaged", weapon="mp_weapon_r97", damageInflicted=12))
+
+    for subscribers in (1, 10, 50):
+        server_task = await startServer()
+        sent_at = {}
+        latencies = []
+        received = 0
+        done = asyncio.Event()
+
+        async def subscribe(websocket):
+            nonlocal received
+            async for frame in websocket:
+                latencies.append(time.perf_counter() - sent_at[int.from_bytes(frame[:4], "little")])
+                received += 1
+                if received == subscribers * len(sent_at):
+                    done.set()
+
+        clients = [await websockets.connect(URI) for _ in range(subscribers)]
+        readers = [asyncio.create_task(subscribe(client)) for client in clients]
+
+        async with websockets.connect(URI) as game:
+            # Latency at a steady rate
+            started = time.perf_counter()
+            for index in range(frames):
+                sent_at[index] = time.perf_counter()
+                await game.send(index.to_bytes(4, "little") + payload)
+                await pace(index + 1, started, rate)
+            await asyncio.wait_for(done.wait(), 60)
+            results += percentiles(f"fanout.{subscribers}", latencies)
+
+            # Throughput with the game client sending as fast as it can
+            done.clear()
+            started = time.perf_counter()
+            for index in range(frames, frames * 2):
+                sent_at[index] = time.perf_counter()
+                await game.send(index.to_bytes(4, "little") + payload)
+            await asyncio.wait_for(done.wait(), 60)
+            results.append(result(f"fanout.{subscribers}", "throughput", frames / (time.perf_counter() - started), "frames/s"))
+
+        for reader in readers:
+            reader.cancel()
+        for client in clients:
+            await client.close()
+        await stopTask(server_task)
+
+    return results
+
+@benchmark("pool")
+async def benchmarkPool(frames = 20000):
+    # Inline decoding against the decode pool on the same mixed frames, events delivered in order either way
+    batch = [wrapEvent(message) for messages in sampleMessages(frames).values() for message in messages]
+    results = []
+
+    started = time.perf_counter()
+    for frame in batch:
+        Core.decodeSocketEvent(frame)
+    results.append(result("pool.inline", "throughput", len(batch) / (time.perf_counter() - started), "frames/s"))
+
+    for workers in sorted({1, os.cpu_count() or 1}):
+        for batch_size in (32, 256):
+            pool = LiveApex.DecodePool(workers = workers, batch_size = batch_size)
+            pool.submit([batch[0]]) # Start the workers before timing
+            await asyncio.sleep(0.5)
+
+            delivered = 0
+            done = asyncio.Event()
+
+            async def handler(event_type, event, stamps):
+                nonlocal delivered
+                delivered += 1
+                if delivered == len(batch):
+                    done.set()
+
+            stream = pool.stream(handler)
+            started = time.perf_counter()
+            for frame in batch:
+                await stream.put(frame, "")
+            await stream.flush()
+            await asyncio.wait_for(done.wait(), 120)
+            results.append(result(f"pool.workers{workers}.batch{batch_size}", "throughput", len(batch) / (time.perf_counter() - started), "frames/s"))
+
+            stream.close()
+            pool.close()
+
+    return results
+
+@benchmark("relay")
+async def benchmarkRelay(frames = 20000):
+    # The same mixed frames through a decoding listener and through the raw relay, the game client sending as fast as it can
+    batch = [wrapEvent(message) for messages in sampleMessages(frames).values() for message in messages]
+    results = []
+
+    class CountingSink:
+        def __init__(self):
+            self.frames = 0
+            self.done = asyncio.Event()
+
+        def relay(self, frame, type_url, received_at):
+            self.frames += 1
+            if self.frames == len(batch):
+                self.done.set()
+
+        async def callback(self, event):
+            self.relay(None, None, None)
+
+    for name in ("listener", "relay"):
+        server_task = await startServer()
+        sink = CountingSink()
+        if name == "relay":
+            receiver_task = asyncio.create_task(Core.startRelay([sink]))
+        else:
+            receiver_task = asyncio.create_task(Core.startListener(sink.callback, method = "Protobuf"))
+        await asyncio.sleep(0.2)
+
+        async with websockets.connect(URI) as game:
+            started = time.perf_counter()
+            for frame in batch:
+                await game.send(frame)
+            await asyncio.wait_for(sink.done.wait(), 120)
+            elapsed = time.perf_counter() - started
+
+        results.append(result(f"relay.{name}", "throughput", len(batch) / elapsed, "frames/s"))
+        results.append(result(f"relay.{name}", "bandwidth", sum(map(len, batch)) / elapsed / 1e6, "MB/s"))
+        await stopTask(receiver_task)
+        await stopTask(server_task)
+
+    return results
+
+@benchmark("store")
+def benchmarkStore(frames = 20000):
+    # Time spent on the event loop queueing frames, and how fast the writer thread stores them
+    batch = [wrapEvent(message) for messages in sampleMessages(frames).values() for message in messages]
+    with tempfile.TemporaryDirectory() as directory:
+        store = LiveApex.EventStore(os.path.join(directory, "events.db"))
+        started = time.perf_counter()
+        for frame in batch:
+            store.write(frame, started)
+        queued = time.perf_counter()
+        store.close()
+        finished = time.perf_counter()
+
+    return [
+        result("store.write", "perCall", (queued - started) / len(batch) * 1e9, "ns"),
+        result("store.insert", "throughput", len(batch) / (finished - started), "events/s"),
+    ]
+
+@benchmark("archive")
+def benchmarkArchive(frames = 20000, matches = 20):
+    # Damage per player per weapon over a tournament of identical matches, from decoded dicts against the columnar archive
+    batch = [wrapEvent(message) for messages in sampleMessages(frames).values() for message in messages]
+    decoded = [Core.decodeSocketEvent(frame) for frame in batch]
+    results = []
+
+    started = time.perf_counter()
+    for _ in range(matches):
+        totals = {}
+        for event in decoded:
+            if event.get('category') == "playerDamaged" and 'attacker' in event:
+                key = (event['attacker'].get('nucleusHash', ""), event.get('weapon', ""))
+                totals[key] = totals.get(key, 0) + event.get('damageInflicted', 0)
+    results.append(result("archive.dicts", "damagePerPlayerWeapon", (time.perf_counter() - started) * 1000, "ms"))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "match.lapa")
+        started = time.perf_counter()
+        with LiveApex.Archiver(path) as archiver:
+            for frame in batch:
+                archiver.write(frame, started)
+        results.append(result("archive.write", "throughput", len(batch) / (time.perf_counter() - started), "frames/s"))
+
+        if LiveApex.archive.numpy is None:
+            return results
+        numpy = LiveApex.archive.numpy
+
+        started = time.perf_counter()
+        player_ids, weapon_ids = {}, {}
+        keys, damage = [], []
+        for _ in range(matches):
+            with LiveApex.Archive(path) as archive:
+                attacker = archive.remap("PlayerDamaged", "attacker", player_ids)
+                hit = attacker >= 0
+                keys.append(attacker[hit] * 4096 + archive.remap("PlayerDamaged", "weapon", weapon_ids)[hit]) # (player, weapon) pairs, well under 4096 weapons
+                damage.append(archive.column("PlayerDamaged", "damageInflicted")[hit])
+        totals = numpy.bincount(numpy.concatenate(keys), weights=numpy.concatenate(damage))
+        results.append(result("archive.columns", "damagePerPlayerWeapon", (time.perf_counter() - started) * 1000, "ms"))
+
+    return results
+
+@benchmark("translator")
+def benchmarkTranslator():
+    weapons = list(LiveApex.translator.weapons)
+    maps = list(LiveApex.translator.maps)
+    datacenters = list(LiveApex.translator.datacenters)
+    playlists = list(LiveApex.translator.playlists)
+    budget = Translator.PER_CALL_BUDGET_NS
+    return [
+        result("translator.translateWeapon", "perCall", 1e9 / timeLoop(Translator.translateWeapon, weapons), "ns", budget),
+        result("translator.translateMap", "perCall", 1e9 / timeLoop(Translator.translateMap, maps), "ns", budget),
+        result("translator.translateDatacenter", "perCall", 1e9 / timeLoop(Translator.translateDatacenter, datacenters), "ns", budget),
+        result("translator.translatePlaylist", "perCall", 1e9 / timeLoop(Translator.translatePlaylist, playlists), "ns", budget),
+        result("translator.translateMany", "perName", 1e9 / (len(weapons) * timeLoop(lambda names: Translator.translateMany("weapon", names), [weapons])), "ns", budget),
+    ]
+
+@benchmark("lobby")
+async def benchmarkLobby(requests = 200):
+    server_task = await startServer()
+    game = FakeGameClient(generator=MatchGenerator(seed=1))
+    game_task = asyncio.create_task(game.run(stream = False))
+    await asyncio.sleep(0.2)
+
+    round_trips = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        await Lobby.getPlayers(refresh = True)
+        round_trips.append(time.perf_counter() - started)
+
+    # Reads answered from Core.lobby_cache, no round-trip
+    cached_reads = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        await Lobby.getPlayers()
+        cached_reads.append(time.perf_counter() - started)
+
+    # Concurrent requests over the shared connection
+    started = time.perf_counter()
+    await asyncio.gather(*(Lobby.getSettings(refresh = True) for _ in range(requests)))
+    concurrent = requests / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(Lobby.setTeamName(team_id, f"Team {team_id}") for team_id in range(2, 22)))
+    setup = time.perf_counter() - started
+
+    await Core.closeCommandClient()
+    await stopTask(game_task)
+    await stopTask(server_task)
+    return percentiles("lobby.getPlayers", round_trips) + percentiles("lobby.getPlayersCached", cached_reads) + [
+        result("lobby.getSettings", "concurrentThroughput", concurrent, "requests/s"),
+        result("lobby.setTeamName20", "total", setup * 1000, "ms"),
+    ]
+
+def runSuite(groups):
+    results = []
+    for group in groups:
+        function = benchmarks[group]
+        print(f"Running {group}...", file=sys.stderr)
+        outcome = function()
+        if asyncio.iscoroutine(outcome):
+            outcome = asyncio.run(outcome)
+        results += outcome
+
+    return {
+        "metadata": {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "protobuf": protobuf_version,
+            "websockets": websockets.__version__,
+            "jsonParser": LiveApex.events.JSON_PARSER,
+            "groups": groups,
+        },
+        "results": results,
+    }
+
+def overBudget(report):
+    return [entry for entry in report["results"] if "budget" in entry and entry["value"] > entry["budget"]]
+
+def compare(current, baseline):
+    # Ratio of current to baseline per metric, > 1 means the value grew
+    previous = {(entry["name"], entry["metric"]): entry["value"] for entry in baseline["results"]}
+    comparison = []
+    for entry in current["results"]:
+        before = previous.get((entry["name"], entry["metric"]))
+        if before:
+            comparison.append({**entry, "baseline": before, "ratio": entry["value"] / before})
+    return comparison
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LiveApex benchmark suite.")
+    parser.add_argument("--output", help="write results as JSON to this file (default stdout)")
+    parser.add_argument("--compare", help="a previous results file to compare against")
+    parser.add_argument("--only", nargs="*", choices=list(benchmarks), help="benchmark groups to run (default all)")
+    arguments = parser.parse_args()
+
+    LiveApex.Logger.setLevel("WARNING")
+    report = runSuite(arguments.only or list(benchmarks))
+
+    if arguments.compare:
+        with open(arguments.compare) as file:
+            report["comparison"] = compare(report, json.load(file))
+
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    # Fail the run if a documented cost was exceeded
+    exceeded = overBudget(report)
+    for entry in exceeded:
+        print(f"Over budget: {entry['name']} {entry['metric']} {entry['value']:.0f}{entry['unit']} > {entry['budget']}{entry['unit']}", file=sys.stderr)
+    if exceeded:
+        sys.exit(1)
@@ -0,0 +1,68 @@
+import asyncio
+import time
+import unittest
+
+import websockets
+
+from LiveApex import Core, EventQueue, DecodePool, events_pb2
+from LiveApex.generator import wrapEvent
+
+def frames(count):
+    return [wrapEvent(events_pb2.PlayerConnected(timestamp=index + 1, category="playerConnected")) for index in range(count)]
+
+class ListenerShutdownTest(unittest.IsolatedAsyncioTestCase):
+    async def serveFrames(self, sent, port, hold = False):
+        # A stand-in game server that sends every frame to the listener, then closes the connection or holds it open
+        async def handler(websocket, path):
+            for frame in sent:
+                await websocket.send(frame)
+            if hold:
+                await websocket.wait_closed()
+
+        server = await websockets.serve(handler, "127.0.0.1", port)
+        self.addAsyncCleanup(server.wait_closed)
+        self.addCleanup(server.close)
+
+    async def test_cancel_with_queued_events_returns_promptly(self):
+        await self.serveFrames(frames(20), 7801, hold = True)
+        started = asyncio.Event()
+
+        async def callback(event):
+            started.set()
+            await asyncio.sleep(1)
+
+        queue = EventQueue(maxsize = 100)
+        listener = asyncio.create_task(Core.startListener(callback, queue = queue, port = 7801, drain_timeout = 15))
+        await asyncio.wait_for(started.wait(), 5)
+        await asyncio.sleep(0.1) # Let the rest of the frames queue up
+
+        cancelled_at = time.monotonic()
+        listener.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await listener
+
+        self.assertLess(time.monotonic() - cancelled_at, 1)
+        self.assertEqual(len(queue), 0)
+
+    async def test_queued_events_are_delivered_on_close(self):
+        await self.serveFrames(frames(20), 7802)
+        received = []
+
+        async def callback(event):
+            await asyncio.sleep(0.01)
+            received.append(event['timestamp'])
+
+        await asyncio.wait_for(Core.startListener(callback, queue = EventQueue(maxsize = 100), port = 7802), 10)
+        self.assertEqual(received, [str(index + 1) for index in range(20)])
+
+    async def test_pooled_frames_are_delivered_on_close(self):
+        await self.serveFrames(frames(300), 7803)
+        received = []
+
+        async def callback(event):
+            received.append(event['timestamp'])
+
+        pool = DecodePool(workers = 1, batch_size = 128, max_delay = 10) # The last partial batch is only sent by the drain
+        self.addCleanup(pool.close)
+        await asyncio.wait_for(Core.startListener(callback, port = 7803, decode_pool = pool), 30)
+        self.assertEqual(received, [str(index + 1) for index in range(300)])
@@ -0,0 +1,34 @@
+import asyncio
+import unittest
+
+from LiveApex import Core, Lobby
+from LiveApex.scheduler import CommandScheduler
+
+class LobbyCommandTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        # Commands are collected instead of being sent to a game client
+        self.sent = []
+
+        async def send(command):
+            self.sent.append(command)
+
+        scheduler = CommandScheduler(send)
+        self.addCleanup(scheduler.close)
+        self.addCleanup(setattr, Core, "command_scheduler", Core.command_scheduler)
+        Core.command_scheduler = scheduler
+
+    async def test_commands_are_awaitable_and_return_once_sent(self):
+        await Lobby.createLobby()
+        await asyncio.create_task(Lobby.setReady(True))
+        self.assertEqual(self.sent, [{"customMatch_CreateLobby": {}}, {"customMatch_SetReady": {"isReady": True}}])
+
+    async def test_repeated_chat_is_never_coalesced(self):
+        await asyncio.gather(Lobby.sendChatMessage("gg"), Lobby.sendChatMessage("gg"))
+        self.assertEqual(self.sent, [{"customMatch_SendChat": {"text": "gg"}}] * 2)
+
+    async def test_superseded_settings_send_the_newest(self):
+        await asyncio.gather(
+            Lobby.setSettings("des_hu_cm", True, True, True, False, False),
+            Lobby.setSettings("des_hu_cm", False, True, True, False, False),
+        )
+        self.assertEqual([command["customMatch_SetSettings"]["adminChat"] for command in self.sent], [False])
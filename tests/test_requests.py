@@ -0,0 +1,56 @@
+import asyncio
+import json
+import unittest
+
+from google.protobuf.json_format import MessageToDict
+
+from LiveApex import Core, events_pb2
+from LiveApex.client import PendingRequests
+from LiveApex.generator import wrapEvent
+
+LOBBY_PLAYERS = "rtech.liveapi.CustomMatch_LobbyPlayers"
+
+def lobbyPlayersResponse(success):
+    response = events_pb2.Response(success=success)
+    response.result.Pack(events_pb2.CustomMatch_LobbyPlayers(players=[events_pb2.CustomMatch_LobbyPlayer(name="Player1", teamId=2)]))
+    return response
+
+def jsonFrame(message):
+    # The frame the game sends with +cl_liveapi_use_protobuf 0
+    live_api_event = events_pb2.LiveAPIEvent()
+    live_api_event.gameMessage.Pack(message)
+    return json.dumps(MessageToDict(live_api_event))
+
+class PendingReplyTest(unittest.IsolatedAsyncioTestCase):
+    async def test_successful_response_resolves_with_result(self):
+        pending = PendingRequests()
+        future = pending.add(LOBBY_PLAYERS)
+        Core.decodeSocketEvent(wrapEvent(lobbyPlayersResponse(True)), pending)
+
+        result = await asyncio.wait_for(future, 1)
+        self.assertEqual(result['players'][0]['name'], "Player1")
+
+    async def test_failed_response_raises(self):
+        pending = PendingRequests()
+        future = pending.add(LOBBY_PLAYERS)
+        Core.decodeSocketEvent(wrapEvent(lobbyPlayersResponse(False)), pending)
+
+        with self.assertRaisesRegex(Exception, "requestFailed"):
+            await asyncio.wait_for(future, 1)
+        self.assertFalse(pending)
+
+    async def test_json_response_resolves_with_result(self):
+        pending = PendingRequests()
+        future = pending.add(LOBBY_PLAYERS)
+        Core.decodeSocketEvent(jsonFrame(lobbyPlayersResponse(True)), pending)
+
+        result = await asyncio.wait_for(future, 1)
+        self.assertEqual(result['players'][0]['name'], "Player1")
+
+    async def test_failed_json_response_raises(self):
+        pending = PendingRequests()
+        future = pending.add(LOBBY_PLAYERS)
+        Core.decodeSocketEvent(jsonFrame(lobbyPlayersResponse(False)).encode(), pending)
+
+        with self.assertRaisesRegex(Exception, "requestFailed"):
+            await asyncio.wait_for(future, 1)
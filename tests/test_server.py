@@ -0,0 +1,28 @@
+import asyncio
+import unittest
+
+from LiveApex.server import Subscriber
+
+class StalledConnection:
+    # A client connection whose sends never complete
+    remote_address = ("127.0.0.1", 0)
+
+    def __init__(self):
+        self.closed_with = None
+
+    async def send(self, message):
+        await asyncio.Future()
+
+    async def close(self, code = 1000, reason = ""):
+        self.closed_with = (code, reason)
+
+class SubscriberTest(unittest.IsolatedAsyncioTestCase):
+    async def test_disconnect_policy_closes_slow_client(self):
+        websocket = StalledConnection()
+        subscriber = Subscriber(websocket, "default", max_queue = 2, slow_client_policy = "disconnect")
+        for index in range(3):
+            subscriber.push(b"frame", 0.0)
+
+        await asyncio.wait_for(subscriber._close_task, 1)
+        self.assertEqual(websocket.closed_with, (1008, "Client too slow"))
+        self.assertEqual(subscriber.dropped, 1)